@@ -1,16 +1,19 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
 import pydeck as pdk
 from millify import millify
+from utils.aggregates import state_table
+from utils.data import latest_month, month_columns, shift_month, zillow_months
+from utils.growth import growth_table, top_n
+from utils.profiling import begin_rerun, end_rerun, stage
+from utils.refresh import pin_data_version
+from utils.spatial import MAP_LEVELS, cell_radius, map_pyramid
 
 st.set_page_config(page_title="Home Page", page_icon=":house:", layout="wide", initial_sidebar_state="expanded")
 
-
-@st.cache_data
-def load_df():
-    df = pd.read_csv('data/rentcrime_kaggle.csv')
-    return df
+PAGE = 'home'
+begin_rerun(PAGE)
+pin_data_version()
 
 
 # Streamlit app title
@@ -20,84 +23,120 @@ with st.container():
 
     col1,col2 = st.columns(2)
 
-    df = pd.read_csv('data/home_value.csv')
-
-
-    with col2:
-        df = df.dropna(subset=['StateName'])
+    # Precomputed state x month averages; only the latest month and the growth baselines are used
+    with stage('aggregate'):
+        state_mean_df = state_table('home_value', 'mean')
+    first_month = month_columns(state_mean_df)[0]
+    last_month = latest_month(state_mean_df)
+    month_1yr = shift_month(last_month, -1)
+    month_5yr = shift_month(last_month, -5)
+    month_10yr = shift_month(last_month, -10)
+    all_time_years = pd.Timestamp(last_month).year - pd.Timestamp(first_month).year
 
-        # Aggregate data by state and compute average values
-        state_avg_df = df.groupby('StateName').mean()
 
-        # Calculate growth metrics based on the aggregated data
-        state_avg_df['1yr Growth (%)'] = ((state_avg_df['2024-04-30'] - state_avg_df['2023-04-30']) / state_avg_df['2023-04-30']) * 100
-        state_avg_df['5yr Growth (%)'] = ((state_avg_df['2024-04-30'] - state_avg_df['2019-04-30']) / state_avg_df['2019-04-30']) * 100
-        state_avg_df['10yr Growth (%)'] = ((state_avg_df['2024-04-30'] - state_avg_df['2014-04-30']) / state_avg_df['2014-04-30']) * 100
-        state_avg_df['All-time Growth (%)'] = ((state_avg_df['2024-04-30'] - state_avg_df['2000-01-31']) / state_avg_df['2000-01-31']) * 100
+    # Growth of each state's average home value over the standard windows
+    growth_windows = {'1-Year': month_1yr, '5-Year': month_5yr, '10-Year': month_10yr, 'All-Time': first_month}
+    with stage('growth'):
+        state_growth = {label: growth_table('home_value', start, last_month, level='state') for label, start in growth_windows.items()}
 
-        # Calculate the average prices for each timeframe
-        state_avg_df['Avg Price 2000'] = state_avg_df['2000-01-31']
-        state_avg_df['Avg Price 2014'] = state_avg_df['2014-04-30']
-        state_avg_df['Avg Price 2019'] = state_avg_df['2019-04-30']
-        state_avg_df['Avg Price 2023'] = state_avg_df['2023-04-30']
-        state_avg_df['Avg Price 2024'] = state_avg_df['2024-04-30']
 
+    with col2:
         # Dropdown for state selection
-        selected_state = st.selectbox("Select a State to view metrics:", state_avg_df.index)
+        selected_state = st.selectbox("Select a State to view metrics:", state_mean_df.index)
 
         # Display metrics for the selected state
-        if selected_state in state_avg_df.index:
-
-            price_2000 = f"$"+millify(state_avg_df.loc[selected_state, 'Avg Price 2000'], precision=2)
-            price_2014 = f"$"+millify(state_avg_df.loc[selected_state, 'Avg Price 2014'], precision=2)
-            price_2019 = f"$"+millify(state_avg_df.loc[selected_state, 'Avg Price 2019'], precision=2)
-            price_2023 = f"$"+millify(state_avg_df.loc[selected_state, 'Avg Price 2023'], precision=2)
-            price_2024 = f"$"+millify(state_avg_df.loc[selected_state, 'Avg Price 2024'], precision=2)
-            
+        if selected_state in state_mean_df.index:
+
+            price_first = f"$"+millify(state_growth['All-Time'].loc[selected_state, 'start_value'], precision=2)
+            price_10yr = f"$"+millify(state_growth['10-Year'].loc[selected_state, 'start_value'], precision=2)
+            price_5yr = f"$"+millify(state_growth['5-Year'].loc[selected_state, 'start_value'], precision=2)
+            price_latest = f"$"+millify(state_growth['1-Year'].loc[selected_state, 'end_value'], precision=2)
+
             # Display growth percentages
-            st.metric("1-Year Growth",price_2024, f"{state_avg_df.loc[selected_state, '1yr Growth (%)']:.2f}%")
-            st.metric("5-Year Growth", price_2019, f"{state_avg_df.loc[selected_state, '5yr Growth (%)']:.2f}%")
-            st.metric("10-Year Growth", price_2014, f"{state_avg_df.loc[selected_state, '10yr Growth (%)']:.2f}%")
-            st.metric("24-Year Growth (All-time)", price_2000, f"{state_avg_df.loc[selected_state, 'All-time Growth (%)']:.2f}%")
+            st.metric("1-Year Growth",price_latest, f"{state_growth['1-Year'].loc[selected_state, 'pct_change']:.2f}%")
+            st.metric("5-Year Growth", price_5yr, f"{state_growth['5-Year'].loc[selected_state, 'pct_change']:.2f}%")
+            st.metric("10-Year Growth", price_10yr, f"{state_growth['10-Year'].loc[selected_state, 'pct_change']:.2f}%")
+            st.metric(f"{all_time_years}-Year Growth (All-time)", price_first, f"{state_growth['All-Time'].loc[selected_state, 'pct_change']:.2f}%")
         else:
             st.write(f"No data available for {selected_state}")
 
-    highest_1yr_growth_state = state_avg_df['1yr Growth (%)'].idxmax()
-    highest_1yr_growth_value = state_avg_df['1yr Growth (%)'].max()
-
-    highest_5yr_growth_state = state_avg_df['5yr Growth (%)'].idxmax()
-    highest_5yr_growth_value = state_avg_df['5yr Growth (%)'].max()
-
-    highest_10yr_growth_state = state_avg_df['10yr Growth (%)'].idxmax()
-    highest_10yr_growth_value = state_avg_df['10yr Growth (%)'].max()
-
-    highest_all_time_growth_state = state_avg_df['All-time Growth (%)'].idxmax()
-    highest_all_time_growth_value = state_avg_df['All-time Growth (%)'].max()
-
-    st.markdown(f"""
+    # Highest-growth state for every window, from a partial sort of each growth table
+    growth_leaders = ""
+    for label, growth in state_growth.items():
+        leader = top_n(growth, 1)
+        growth_leaders += f"""
         <p style="font-size: 20px;">
-            <strong>Highest 1-Year Growth: </strong>{highest_1yr_growth_state} <span style="color: green;">({highest_1yr_growth_value:.2f}%)</span>
-        </p>
-        <p style="font-size: 20px;">
-            <strong>Highest 5-Year Growth: </strong>{highest_5yr_growth_state} <span style="color: green;">({highest_5yr_growth_value:.2f}%)</span>
-        </p>
-        <p style="font-size: 20px;">
-            <strong>Highest 10-Year Growth: </strong>{highest_10yr_growth_state} <span style="color: green;">({highest_10yr_growth_value:.2f}%)</span>
-        </p>
-        <p style="font-size: 20px;">
-            <strong>Highest All-Time Growth: </strong>{highest_all_time_growth_state} <span style="color: green;">({highest_all_time_growth_value:.2f}%)</span>
-        </p>
-    """, unsafe_allow_html=True)
-
-
+            <strong>Highest {label} Growth: </strong>{leader.index[0]} <span style="color: green;">({leader['pct_change'].iloc[0]:.2f}%)</span>
+        </p>"""
+    st.markdown(growth_leaders, unsafe_allow_html=True)
 
 
+    with col1:
 
+        # Listings are pre-binned per detail level, so the payload is bounded by the number of cells
+        map_level = st.select_slider("Map detail", options=list(MAP_LEVELS), value='Region')
+        with stage('map:bins'):
+            map_bins = map_pyramid()[map_level]
+
+        with stage('map:send'):
+            st.pydeck_chart(pdk.Deck(
+                layers=[pdk.Layer(
+                    'HexagonLayer',
+                    data=map_bins,
+                    get_position=['longitude', 'latitude'],
+                    # Column height is the number of listings; the default 0-1000 elevation range is
+                    # scaled so the tallest column stands about four cell radii high at every detail level
+                    extruded=True,
+                    get_elevation_weight='count',
+                    elevation_aggregation='SUM',
+                    elevation_scale=cell_radius(map_level) * 4 / 1000,
+                    get_color_weight='median_price',
+                    color_aggregation='MEAN',
+                    radius=cell_radius(map_level),
+                    coverage=0.9,
+                    pickable=True,
+                )],
+                initial_view_state=pdk.ViewState(latitude=39.5, longitude=-98.35, zoom=2.7, pitch=40),
+                # A hexagon can cover several grid cells, so its colour is the mean of their median rents
+                tooltip={'text': '{elevationValue} listings\nMean of cell median rents: ${colorValue}'},
+            ))
 
 
-    with col1:
+st.markdown("---")
+st.header("Home Value Growth Rankings")
 
-        st.map(load_df(),color='#2243B6',zoom=1.7)
+with st.container():
+    all_months = zillow_months('home_value')
+    window_start, window_end = st.select_slider("Growth window", options=all_months, value=(month_5yr, last_month))
+
+    col1, col2, col3 = st.columns(3)
+    ranking_state = col1.selectbox("State", ['All States'] + list(state_mean_df.index))
+    ranking_order = col2.radio("Rank by", ['Highest Growth', 'Lowest Growth'], horizontal=True)
+    ranking_size = col3.number_input("Regions", min_value=5, max_value=100, value=10, step=5)
+
+    if window_start < window_end:
+        with stage('rankings'):
+            region_growth = growth_table('home_value', window_start, window_end)
+            ranked = top_n(
+                region_growth,
+                ranking_size,
+                largest=ranking_order == 'Highest Growth',
+                state=None if ranking_state == 'All States' else ranking_state,
+            )
+        st.dataframe(
+            ranked[['RegionName', 'StateName', 'start_value', 'end_value', 'change', 'pct_change', 'cagr']].rename(columns={
+                'RegionName': 'Region',
+                'StateName': 'State',
+                'start_value': f'Value {window_start}',
+                'end_value': f'Value {window_end}',
+                'change': 'Change ($)',
+                'pct_change': 'Growth (%)',
+                'cagr': 'CAGR (%)',
+            }).round(2),
+            hide_index=True,
+        )
+    else:
+        st.write("Select a window whose end month is after its start month.")
 
 
 st.markdown("---")
@@ -106,5 +145,4 @@ st.markdown("The home value data is sourced from https://www.zillow.com/research
 st.markdown("The market heat index data is sourced from https://www.zillow.com/research/data/(#).")
 st.markdown("The rent and demographic data is sourced from https://www.kaggle.com/datasets/hieppham1341/apartment-rentals-merged-with-socio-economics-info(#).")
 
-
-
+end_rerun()
@@ -1,17 +1,37 @@
-import pandas as pd
 import streamlit as st
-import matplotlib.pyplot as plt
-import seaborn as sns
+from utils import figures
+from utils.aggregates import rollup_table
+from utils.charts import show_chart
+from utils.correlation import ROLLING_WINDOW, zillow_correlations
+from utils.data import ID_COLUMNS, ZILLOW_SOURCES, data_version, load_home_values, load_market_heat, month_columns
+from utils.index import zillow_index
+from utils.interactive import home_values_chart, state_trends_chart, value_heat_chart
+from utils.profiling import begin_rerun, end_rerun, stage
+from utils.refresh import pin_data_version
+from utils.reports import PLOT_START, home_value_report
+from utils.timeseries import zillow_series
 
-# Load data
-home_value_data = pd.read_csv('data/home_value.csv')
-heat_index_data = pd.read_csv('data/market_heat.csv')
+PAGE = 'home_values'
+
+
+def in_range(df, start, end):
+    # Shared memory-mapped frame limited to the selected months; only built when the raw data is shown
+    return df[ID_COLUMNS + [col for col in month_columns(df) if start <= col <= end]]
+
+
+def recent_months(table, start=PLOT_START, end=None):
+    return table[[col for col in table.columns if start <= col and (end is None or col <= end)]]
 
-home_value_data = home_value_data[['RegionID', 'SizeRank', 'RegionName', 'RegionType', 'StateName'] + [col for col in home_value_data.columns if col.startswith(('2018', '2019', '2020', '2021', '2022', '2023', '2024'))]]
-heat_index_data = heat_index_data[['RegionID', 'SizeRank', 'RegionName', 'RegionType', 'StateName'] + [col for col in heat_index_data.columns if col.startswith(('2018', '2019', '2020', '2021', '2022', '2023', '2024'))]]
 
-states = home_value_data['StateName'].unique()
-regions_by_state = {state: home_value_data[home_value_data['StateName'] == state]['RegionName'].unique() for state in states}
+begin_rerun(PAGE)
+pin_data_version()
+
+# Load data
+with stage('load'):
+    region_index = zillow_index()
+    version = data_version(*ZILLOW_SOURCES)
+    states = region_index.states
+    months = zillow_series().months
 
 # Streamlit UI
 st.title('Home Values and Market Heat Index :house::chart_with_upwards_trend:')
@@ -20,74 +40,44 @@ selected_state = st.selectbox('Select a State 📍', states)
 
 if selected_state:
     # Region selection based on selected state
-    regions = regions_by_state[selected_state]
+    regions = region_index.regions(selected_state)
     selected_region = st.selectbox('Select a Region', regions)
 
     if selected_region:
-        # Filter data based on selected state and region
-        filtered_home_value_data = home_value_data[(home_value_data['StateName'] == selected_state) & (home_value_data['RegionName'] == selected_region)]
-        filtered_heat_index_data = heat_index_data[(heat_index_data['StateName'] == selected_state) & (heat_index_data['RegionName'] == selected_region)]
-
-        if not filtered_home_value_data.empty and not filtered_heat_index_data.empty:
-            # Prepare data for plotting
-            filtered_home_value_data = filtered_home_value_data.set_index('RegionName').transpose().reset_index()
-            filtered_home_value_data.columns = ['Date', selected_region]
-            filtered_home_value_data = filtered_home_value_data[1:]  # Skip the first row which contains the RegionName
-            filtered_home_value_data['Date'] = pd.to_datetime(filtered_home_value_data['Date'], errors='coerce')
-            filtered_home_value_data.dropna(subset=['Date'], inplace=True)
-
-            filtered_heat_index_data = filtered_heat_index_data.set_index('RegionName').transpose().reset_index()
-            filtered_heat_index_data.columns = ['Date', selected_region]
-            filtered_heat_index_data = filtered_heat_index_data[1:]  # Skip the first row which contains the RegionName
-            filtered_heat_index_data['Date'] = pd.to_datetime(filtered_heat_index_data['Date'], errors='coerce')
-            filtered_heat_index_data.dropna(subset=['Date'], inplace=True)
+        # Any window of the full history; charts are downsampled, so wider ranges cost the same
+        default_start = next((month for month in months if month >= PLOT_START), months[0])
+        range_start, range_end = st.select_slider('Date range', options=months, value=(default_start, months[-1]))
 
-            # Create columns for side by side plots
-            avg_price = filtered_home_value_data[selected_region].mean()
-            max_price = filtered_home_value_data[selected_region].max()
-            min_price = filtered_home_value_data[selected_region].min()
-            latest_price = filtered_home_value_data[selected_region].iloc[-1]
-            earliest_price = filtered_home_value_data[selected_region].iloc[0]
-            price_change = latest_price - earliest_price
-            price_change_percentage = (price_change / earliest_price) * 100
+        with stage('report'):
+            report = home_value_report(selected_state, selected_region, range_start, range_end)
+
+        if report is not None:
+            metrics = report.metrics
 
-            
             # Create columns for side by side plots
+            selection = (selected_state, selected_region, range_start, range_end)
+            dates, home_values, heat_values = report.data['dates'], report.data['home_values'], report.data['heat_values']
             col1, col2 = st.columns(2)
 
             with col1:
                 # Plotting Home Values Over Time
                 st.header(f'Avg Home Values in {selected_region}')
-                fig, ax = plt.subplots(figsize=(7, 5))
-                sns.lineplot(data=filtered_home_value_data, x='Date', y=selected_region, marker='o', ax=ax)
-                ax.set_title(f'Home Values in {selected_region} Over Time', fontsize=16)
-                ax.set_xlabel('Date', fontsize=14)
-                ax.set_ylabel('Home Value', fontsize=14)
-                ax.grid(True)
-                ax.set_facecolor('#e4e4e4')
-                fig.patch.set_facecolor('#e4e4e4')
-                st.pyplot(fig)
+                with stage('chart:home_values'):
+                    st.vega_lite_chart(*home_values_chart(dates, home_values, selected_region), width='stretch')
                 
                 
 
             with col2:
                 # Plotting House Prices Distribution
                 st.header(f'Price Distribution in {selected_region}')
-                fig, ax = plt.subplots(figsize=(7, 5))
-                sns.histplot(filtered_home_value_data[selected_region], kde=True, ax=ax, color='skyblue')
-                ax.set_title(f'House Prices Distribution in {selected_region}', fontsize=16)
-                ax.set_xlabel('House Price', fontsize=14)
-                ax.set_ylabel('Frequency', fontsize=14)
-                ax.set_facecolor('#e4e4e4')
-                fig.patch.set_facecolor('#e4e4e4')
-                st.pyplot(fig)
+                show_chart(PAGE, 'price_distribution', selection, version, report.charts['price_distribution'])
 
                 
             with st.container():
                 col1, col2, col3 = st.columns(3)
-                col2.metric("Average Price", f"${avg_price:,.2f}")
-                col1.metric("Highest Price", f"${max_price:,.2f}")
-                col3.metric("Lowest Price", f"${min_price:,.2f}")
+                col2.metric("Average Price", f"${metrics['average_price']:,.2f}")
+                col1.metric("Highest Price", f"${metrics['highest_price']:,.2f}")
+                col3.metric("Lowest Price", f"${metrics['lowest_price']:,.2f}")
 
             
             with st.container():
@@ -100,54 +90,65 @@ if selected_state:
 
             # Plotting correlation between home values and market heat index
             st.header(f'Correlation of Home Values and Market Heat Index in {selected_region}')
-            fig, ax1 = plt.subplots(figsize=(12, 6))
-            ax1.set_title(f"Correlation of Home Values and Market Heat Index in {selected_region}")
-            ax1.set_xlabel('Date')
-            ax1.set_ylabel('Home Values', color='tab:blue')
-            line1, = ax1.plot(filtered_home_value_data['Date'], filtered_home_value_data[selected_region], color='tab:blue', label='Home Values')
-            ax2 = ax1.twinx()
-            ax2.set_ylabel('Market Heat Index', color='tab:red')
-            line2, = ax2.plot(filtered_heat_index_data['Date'], filtered_heat_index_data[selected_region], color='tab:red', label='Market Heat Index')
-            fig.tight_layout()
-            fig.legend(handles=[line1, line2], loc='upper left')
-            st.pyplot(fig)
-
-            # Aggregate Heat Index Data by State
-            state_heat_index = heat_index_data.groupby('StateName').mean()
+            with stage('chart:correlation'):
+                st.vega_lite_chart(*value_heat_chart(dates, home_values, heat_values, selected_region), width='stretch')
+
+            # Precomputed correlation statistics for every region
+            correlations = zillow_correlations()
+            region_correlation = report.data['correlation']
+
+            if region_correlation is not None:
+                col1, col2, col3 = st.columns(3)
+                col1.metric("Pearson Correlation", f"{region_correlation['pearson']:.2f}")
+                col2.metric("Spearman Correlation", f"{region_correlation['spearman']:.2f}")
+                if region_correlation['best_lag'] >= 0:
+                    col3.metric("Heat Index Lead on Price Growth", f"{region_correlation['best_lag']} months", f"r = {region_correlation['best_lag_corr']:.2f}", delta_color='off')
+
+                st.subheader(f"{ROLLING_WINDOW}-Month Rolling Correlation in {selected_region}")
+                st.line_chart(correlations.rolling_correlation(report.data['region_id']))
+
+            st.header("Regions Where Heat Leads Price")
+            leads_scope = st.radio("Regions", ['All States', selected_state], horizontal=True)
+            leaders = correlations.heat_leads_price(10, state=None if leads_scope == 'All States' else selected_state)
+            st.dataframe(
+                leaders[['RegionName', 'best_lag', 'best_lag_corr', 'pearson', 'spearman']].rename(columns={
+                    'RegionName': 'Region',
+                    'best_lag': 'Lead (months)',
+                    'best_lag_corr': 'Lead Correlation',
+                    'pearson': 'Pearson',
+                    'spearman': 'Spearman',
+                }).round(2),
+                hide_index=True,
+            )
 
             # Heat Index Comparison for Selected States
             st.header("Average Market Heat Index Comparison by State (2018-2024)")
-            fig, ax = plt.subplots(figsize=(14, 8))
-            sns.barplot(x=state_heat_index.index, y=state_heat_index.mean(axis=1), ax=ax)
-            ax.set_title("Average Market Heat Index Comparison by State (2018-2024)")
-            ax.set_xlabel("State")
-            ax.set_ylabel("Average Market Heat Index")
-            plt.xticks(rotation=90)
-            st.pyplot(fig)
+
+            def draw_state_heat_index():
+                # Precomputed state x month heat index averages
+                return figures.state_heat_index(recent_months(rollup_table('market_heat', 'state')))
+
+            # Independent of the selected region, so rendered once per data version
+            show_chart(PAGE, 'state_heat_index', None, version, draw_state_heat_index)
 
 
             # Multi-select box for selecting states to compare
-            selected_states = st.multiselect('Select states to compare:', states, default=states[1:4])
+            selected_states = st.multiselect('Select states to compare:', states, default=states[:3])
 
             # Line Plot for Heat Index Trends by State
-            st.header("Market Heat Index Trends by Selected States (2018-2024)")
-            fig, ax = plt.subplots(figsize=(14, 8))
-            ax.set_title("Market Heat Index Trends by Selected States (2018-2024)")
-            for state in selected_states:
-                state_data = heat_index_data[heat_index_data['StateName'] == state].mean()
-                ax.plot(state_data.index[5:], state_data.values[5:], label=state)
-            ax.set_xlabel("Date")
-            ax.set_ylabel("Market Heat Index")
-            plt.legend(loc='upper left')
-            plt.xticks(rotation=45)
-            ax.xaxis.set_major_locator(plt.MaxNLocator(nbins=10))  # To make the x-axis ticks more readable
-            st.pyplot(fig)
+            trends_title = f"Market Heat Index Trends by Selected States ({range_start[:4]}-{range_end[:4]})"
+            st.header(trends_title)
+
+            with stage('chart:state_trends'):
+                # One lookup into the state x month table, however many states are selected
+                state_heat_index = recent_months(rollup_table('market_heat', 'state'), range_start, range_end)
+                st.vega_lite_chart(*state_trends_chart(state_heat_index, selected_states, title=trends_title), width='stretch')
 
             # Show the raw data
             if st.checkbox('Show raw data'):
                 st.subheader('Raw data')
-                st.write(home_value_data)
-                st.write(heat_index_data)
+                st.write(in_range(load_home_values(), range_start, range_end))
+                st.write(in_range(load_market_heat(), range_start, range_end))
 
 st.markdown("---")
 st.markdown("### Data Sources")
@@ -155,4 +156,4 @@ st.markdown("The home value data is sourced from https://www.zillow.com/research
 st.markdown("The market heat index data is sourced from https://www.zillow.com/research/data/(#).")
 st.markdown("The rent and demographic data is sourced from https://www.kaggle.com/datasets/hieppham1341/apartment-rentals-merged-with-socio-economics-info(#).")
 
-
+end_rerun()
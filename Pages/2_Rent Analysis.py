@@ -1,14 +1,21 @@
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import plotly.express as px
+from utils.charts import show_chart
+from utils.data import data_version, load_rent_crime
+from utils.index import rent_crime_index
+from utils.profiling import begin_rerun, end_rerun, stage
+from utils.refresh import pin_data_version
+from utils.reports import rent_report
 
-# Load your data
-data = pd.read_csv('data/rentcrime_kaggle.csv')
+PAGE = 'rent_analysis'
+
+begin_rerun(PAGE)
+pin_data_version()
 
-states = data['state'].unique()
-regions_by_state = {state: data[data['state'] == state]['cityname'].unique() for state in states}
+# Load your data
+with stage('load'):
+    region_index = rent_crime_index()
+    states = region_index.states
+    version = data_version('rent_crime')
 
 # Streamlit UI
 st.title('Rent Analysis :heavy_dollar_sign::house_buildings:')
@@ -16,60 +23,45 @@ selected_state = st.selectbox('Select a State', states)
 
 if selected_state:
     # Region selection based on selected state
-    regions = regions_by_state[selected_state]
+    regions = region_index.regions(selected_state)
     selected_region = st.selectbox('Select a Region', regions)
 
     if selected_region:
-        # Filter data based on selected state and region
-        filtered_data = data[(data['state'] == selected_state) & (data['cityname'] == selected_region)]
+        with stage('report'):
+            report = rent_report(selected_state, selected_region)
+            filtered_data = load_rent_crime('rent').iloc[region_index.rows('rent', selected_state, selected_region)]
+
+        if report is not None:
+            metrics = report.metrics
 
-        if not filtered_data.empty:
             # Create columns for 2x2 grid layout
+            selection = (selected_state, selected_region)
             col1, col2 = st.columns(2)
 
             with col1:
                 with st.container():
                 # Plotting Home Values Over Time
                     st.header(f'Apartment Rent in {selected_region}, {selected_state}')
-                    fig, ax = plt.subplots(figsize=(10, 6))
-                    sns.histplot(filtered_data['price'], kde=True, ax=ax, color='skyblue')
-                    ax.set_title(f'Apartment Rent Prices in {selected_region}, {selected_state}', fontsize=16)
-                    ax.set_xlabel('Rent Price', fontsize=14)
-                    ax.set_ylabel('Frequency', fontsize=14)
-                    ax.set_facecolor('#e4e4e4')
-                    fig.patch.set_facecolor('#e4e4e4')
-                    st.pyplot(fig)
+                    show_chart(PAGE, 'rent_distribution', selection, version, report.charts['rent_distribution'])
                     
 
             with col2:
                 with st.container():
                 # Plotting House Prices Distribution
                     st.header(f'Price vs. Sqft in {selected_region}, {selected_state}')
-                    fig, ax = plt.subplots(figsize=(10, 6))
-                    sns.scatterplot(x=filtered_data['square_feet'], y=filtered_data['price'], ax=ax, color='blue')
-                    ax.set_title(f'Price vs. Square Footage in {selected_region}, {selected_state}', fontsize=16)
-                    ax.set_xlabel('Square Feet', fontsize=14)
-                    ax.set_ylabel('Rent Price', fontsize=14)
-                    ax.set_facecolor('#e4e4e4')
-                    fig.patch.set_facecolor('#e4e4e4')
-                    st.pyplot(fig)
-
-            avg_price = filtered_data['price'].mean()
-            max_price = filtered_data['price'].max()
-            min_price = filtered_data['price'].min()
-            avg_price_per_sqft = (filtered_data['price'] / filtered_data['square_feet']).mean()
-            price_sqft_corr = filtered_data[['price', 'square_feet']].corr().iloc[0, 1]
+                    show_chart(PAGE, 'price_vs_sqft', selection, version, report.charts['price_vs_sqft'])
 
             st.subheader("Metrics")
             col1, col2, col3 = st.columns(3)
             with col1:
-                st.metric("Average Price", f"${avg_price:,.2f}")
-                st.metric("Avg Price per SqFt", f"${avg_price_per_sqft:,.2f}")
+                st.metric("Average Price", f"${metrics['average_price']:,.2f}")
+                st.metric("Avg Price per SqFt", f"${metrics['avg_price_per_sqft']:,.2f}")
             with col2:
-                st.metric("Highest Price", f"${max_price:,.2f}")
-                st.metric("Lowest Price", f"${min_price:,.2f}")
+                st.metric("Highest Price", f"${metrics['highest_price']:,.2f}")
+                st.metric("Lowest Price", f"${metrics['lowest_price']:,.2f}")
             with col3:
-                st.metric("Price-SqFt Correlation", f"{price_sqft_corr:.2f}")
+                st.metric("Price-SqFt Correlation", f"{metrics['price_sqft_corr']:.2f}")
+                st.metric("Median Price", f"${metrics['median_price']:,.2f}")
 
 
             with st.container():
@@ -95,7 +87,4 @@ st.markdown("The home value data is sourced from https://www.zillow.com/research
 st.markdown("The market heat index data is sourced from https://www.zillow.com/research/data/(#).")
 st.markdown("The rent and demographic data is sourced from https://www.kaggle.com/datasets/hieppham1341/apartment-rentals-merged-with-socio-economics-info(#).")
 
-
-
-
-
+end_rerun()
@@ -1,13 +1,23 @@
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
+from utils.charts import show_chart
+from utils.communities import community_index
+from utils.data import data_version, load_rent_crime
+from utils.index import rent_crime_index
+from utils.profiling import begin_rerun, end_rerun, stage
+from utils.refresh import pin_data_version
+from utils.reports import community_report
 
-# Load your data
-data = pd.read_csv('data/rentcrime_kaggle.csv')
+PAGE = 'community_analysis'
+
+begin_rerun(PAGE)
+pin_data_version()
 
-states = data['state'].unique()
-regions_by_state = {state: data[data['state'] == state]['cityname'].unique() for state in states}
+# Load your data
+with stage('load'):
+    region_index = rent_crime_index()
+    communities = community_index()
+    states = region_index.states
+    version = data_version('rent_crime')
 
 # Streamlit UI
 st.title('Community Analysis :closed_lock_with_key:')
@@ -15,15 +25,20 @@ selected_state = st.selectbox('Select a State', states)
 
 if selected_state:
     # Region selection based on selected state
-    regions = regions_by_state[selected_state]
+    regions = region_index.regions(selected_state)
     selected_region = st.selectbox('Select a Region', regions)
 
     if selected_region:
-        # Filter data based on selected state and region
-        filtered_data = data[(data['state'] == selected_state) & (data['cityname'] == selected_region)]
+        with stage('report'):
+            report = community_report(selected_state, selected_region)
+            filtered_data = load_rent_crime('community').iloc[region_index.rows('rent', selected_state, selected_region)]
+
+        if report is not None:
+            race_data = report.data['race_data']
+            crime_data = report.data['crime_data']
 
-        if not filtered_data.empty:
             # Create columns for 2x2 grid layout
+            selection = (selected_state, selected_region)
             col1, col2 = st.columns(2)
                     
 
@@ -31,9 +46,6 @@ if selected_state:
                 with st.container():
                 # Plotting Crime Rates
                     st.header(f'Race Demographics in {selected_region}, {selected_state}')
-                    race_columns = ['racepctblack', 'racePctWhite', 'racePctAsian', 'racePctHisp']
-                    race_data = filtered_data[race_columns].mean()
-                    race_data.index = ['Black', 'White', 'Asian', 'Hispanic']
                 
                     col3a, col3b = st.columns([2, 1])
                     with col3a:
@@ -41,12 +53,7 @@ if selected_state:
                             st.markdown(f"- **{race}**: {pct:.2f}%")
 
                     with col3b:
-                        fig, ax = plt.subplots(figsize=(5, 3))
-                        race_data.plot(kind='pie', ax=ax, colors=['black', '#FFE5B4', '#c9a437', '#a6631d'], startangle=90)
-                        ax.set_ylabel('')  # Hide the y-label for a cleaner look
-                        ax.set_facecolor('#e4e4e4')
-                        fig.patch.set_facecolor('#e4e4e4')
-                        st.pyplot(fig)
+                        show_chart(PAGE, 'race_demographics', selection, version, report.charts['race_demographics'])
                         
         
 
@@ -54,19 +61,7 @@ if selected_state:
                 with st.container():
                 # Plotting Race Demographics
                     st.header(f'Crime Rates in {selected_region}, {selected_state}')
-                    crime_columns = ['murdPerPop', 'rapesPerPop', 'robbbPerPop', 'assaultPerPop', 'burglPerPop', 
-                                    'larcPerPop', 'autoTheftPerPop', 'arsonsPerPop', 'ViolentCrimesPerPop', 'nonViolPerPop']
-                    crime_data = filtered_data[crime_columns].mean()
-                    crime_data.index =['Murder', 'Rape', 'Robbery', 'Assault', 'Burglery', 
-                                    'Larceny', 'Auto Theft', 'Arsons', 'Violent Crimes', 'non Violent']
-                    fig, ax = plt.subplots(figsize=(12, 7))
-                    crime_data.sort_values().plot(kind='barh', ax=ax, color='salmon')
-                    ax.set_title(f'Average Crime Rates in {selected_region}, {selected_state}', fontsize=16)
-                    ax.set_xlabel('Average Incidents per Capita', fontsize=14)
-                    ax.set_ylabel('Crime Type', fontsize=14)
-                    ax.set_facecolor('#e4e4e4')
-                    fig.patch.set_facecolor('#e4e4e4')
-                    st.pyplot(fig)
+                    show_chart(PAGE, 'crime_rates', selection, version, report.charts['crime_rates'])
 
             st.subheader(f"Crime Metrics for {selected_region}, {selected_state}")
             avg_crime_rate = crime_data.mean()
@@ -78,8 +73,8 @@ if selected_state:
             st.markdown(f"- **Lowest Crime Type**: {lowest_crime_type} with {crime_data[lowest_crime_type]:.2f} incidents per capita")
 
 
-            total_population = filtered_data['population'].iloc[0]
-            median_income = filtered_data['medIncome'].iloc[0]
+            total_population = report.metrics['population']
+            median_income = report.metrics['median_income']
             
             st.subheader("Additional Metrics")
             col1, col2= st.columns(2)
@@ -88,6 +83,35 @@ if selected_state:
             with col2:
                 st.metric("Median Household Income", f"${median_income:,.2f}")
 
+            st.subheader(f"Communities Similar to {selected_region}, {selected_state}")
+            st.write("Nearest cities by race demographics, crime rates, population and median income.")
+            col1, col2, col3 = st.columns(3)
+            similar_states = col1.multiselect("Limit to states", states)
+            rents = communities.profiles['median_rent'].dropna()
+            rent_range = None
+            if not rents.empty and rents.min() < rents.max():
+                rent_bounds = (int(rents.min()), int(rents.max()) + 1)
+                rent_range = col2.slider("Median rent range", min_value=rent_bounds[0], max_value=rent_bounds[1], value=rent_bounds)
+                # Only filter once the range is narrowed, so cities without priced listings stay in by default
+                if rent_range == rent_bounds:
+                    rent_range = None
+            similar_count = col3.number_input("Communities", min_value=5, max_value=50, value=10, step=5)
+
+            with stage('similar'):
+                similar = communities.similar(selected_state, selected_region, similar_count, similar_states, rent_range)
+            st.dataframe(
+                similar[['cityname', 'state', 'distance', 'median_rent', 'population', 'medIncome', 'ViolentCrimesPerPop']].rename(columns={
+                    'cityname': 'City',
+                    'state': 'State',
+                    'distance': 'Distance',
+                    'median_rent': 'Median Rent',
+                    'population': 'Population',
+                    'medIncome': 'Median Income',
+                    'ViolentCrimesPerPop': 'Violent Crimes',
+                }).round(2),
+                hide_index=True,
+            )
+
 
 # Show the raw data
 if st.checkbox('Show raw data'):
@@ -100,7 +124,4 @@ st.markdown("The home value data is sourced from https://www.zillow.com/research
 st.markdown("The market heat index data is sourced from https://www.zillow.com/research/data/.")
 st.markdown("The rent and demographic data is sourced from https://www.kaggle.com/datasets/hieppham1341/apartment-rentals-merged-with-socio-economics-info.")
 
-
-
-
-
+end_rerun()
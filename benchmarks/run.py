@@ -0,0 +1,182 @@
+"""Headless benchmark of Home.py and every page against synthetic data.
+
+Each (scale, page) pair runs in a fresh subprocess through Streamlit's AppTest and
+records cold-start time, time to first paint, warm-rerun latency, latency per widget
+change and peak RSS. The page's module imports are timed in a separate fresh process.
+
+    python -m benchmarks.run --scales 1 10 100 --output bench_output.json
+"""
+import argparse
+import ast
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import generate
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES = [
+    'Home.py',
+    'Pages/1_Home_Values.py',
+    'Pages/2_Rent Analysis.py',
+    'Pages/3_Community Analysis.py',
+]
+
+
+def _peak_rss_mb():
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def _timed_run(app, timeout):
+    start = time.perf_counter()
+    app.run(timeout=timeout)
+    elapsed = round(time.perf_counter() - start, 4)
+    if app.exception:
+        raise RuntimeError(app.exception[0].message)
+    return elapsed
+
+
+def _widget_changes(app, timeout):
+    # Change every interactive widget once, in page order, and time the rerun it triggers
+    changes = []
+    for widget in list(app.selectbox):
+        if len(widget.options) > 1:
+            widget.select_index(len(widget.options) // 2)
+            changes.append({'widget': f'selectbox: {widget.label}', 'seconds': _timed_run(app, timeout)})
+    for widget in list(app.select_slider):
+        if len(widget.options) > 1:
+            widget.set_value(widget.options[-1])
+            changes.append({'widget': f'select_slider: {widget.label}', 'seconds': _timed_run(app, timeout)})
+    for widget in list(app.multiselect):
+        unselected = [option for option in widget.options if option not in widget.value]
+        if unselected:
+            widget.select(unselected[0])
+            changes.append({'widget': f'multiselect: {widget.label}', 'seconds': _timed_run(app, timeout)})
+    for widget in list(app.checkbox):
+        widget.check()
+        changes.append({'widget': f'checkbox: {widget.label}', 'seconds': _timed_run(app, timeout)})
+    return changes
+
+
+def _first_paint_probe():
+    # Records when a run enqueues its first element, i.e. when the browser could first draw something
+    from streamlit.runtime.scriptrunner_utils.script_run_context import ScriptRunContext
+
+    probe = {'time': None}
+    enqueue = ScriptRunContext.enqueue
+
+    def recording_enqueue(self, msg):
+        if probe['time'] is None and msg.WhichOneof('type') == 'delta':
+            probe['time'] = time.perf_counter()
+        return enqueue(self, msg)
+
+    ScriptRunContext.enqueue = recording_enqueue
+    return probe
+
+
+def page_import_seconds(page):
+    """Time to execute only the top-level imports of a page, in the current (fresh) process."""
+    with open(os.path.join(REPO_ROOT, page)) as f:
+        tree = ast.parse(f.read())
+    imports = ast.Module(body=[node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))], type_ignores=[])
+    code = compile(imports, page, 'exec')
+    start = time.perf_counter()
+    exec(code, {'__name__': '__bench__'})
+    return round(time.perf_counter() - start, 4)
+
+
+def bench_page(page, reruns=3, timeout=600):
+    """Benchmark one page in the current process; the working directory must contain data/."""
+    from streamlit.testing.v1 import AppTest
+
+    probe = _first_paint_probe()
+    app = AppTest.from_file(os.path.join(REPO_ROOT, page), default_timeout=timeout)
+    start = time.perf_counter()
+    cold = _timed_run(app, timeout)
+    first_paint = round(probe['time'] - start, 4) if probe['time'] else None
+    warm = [_timed_run(app, timeout) for _ in range(reruns)]
+    return {
+        'page': page,
+        'cold_start_seconds': cold,
+        'first_paint_seconds': first_paint,
+        'warm_rerun_seconds': sorted(warm)[len(warm) // 2],
+        'widget_changes': _widget_changes(app, timeout),
+        'peak_rss_mb': _peak_rss_mb(),
+    }
+
+
+def _run_worker(page, workdir, reruns, imports=False):
+    command = [sys.executable, '-m', 'benchmarks.run', '--worker', page, '--workdir', workdir, '--reruns', str(reruns)]
+    result = subprocess.run(command + (['--imports'] if imports else []), cwd=REPO_ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        return {'page': page, 'error': result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'failed'}
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def run(scales, data_root, reruns=3, keep_cache=False):
+    results = []
+    for scale in scales:
+        workdir = os.path.join(data_root, f'x{scale}')
+        data_dir = os.path.join(workdir, 'data')
+        if os.path.exists(os.path.join(data_dir, 'rentcrime_kaggle.csv')):
+            rows = None
+        else:
+            print(f'generating {scale}x data in {workdir}', file=sys.stderr)
+            rows = generate(workdir, scale)
+
+        for page in PAGES:
+            # A cold start includes the CSV ingest unless the derived store is kept
+            if not keep_cache:
+                shutil.rmtree(os.path.join(data_dir, '.cache'), ignore_errors=True)
+            print(f'{scale}x {page}', file=sys.stderr)
+            result = _run_worker(page, workdir, reruns)
+            result.update(_run_worker(page, workdir, reruns, imports=True))
+            result.update({'scale': scale, 'rows': rows})
+            results.append(result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100])
+    parser.add_argument('--data-root', help='Directory holding (or receiving) the generated x<scale> datasets')
+    parser.add_argument('--output', default='bench_output.json')
+    parser.add_argument('--reruns', type=int, default=3)
+    parser.add_argument('--keep-cache', action='store_true', help='Measure cold starts against an existing derived store')
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    parser.add_argument('--workdir', help=argparse.SUPPRESS)
+    parser.add_argument('--imports', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        sys.path.insert(0, REPO_ROOT)
+        os.chdir(args.workdir)
+        if args.imports:
+            print(json.dumps({'page': args.worker, 'import_seconds': page_import_seconds(args.worker)}))
+        else:
+            print(json.dumps(bench_page(args.worker, args.reruns)))
+        return
+
+    data_root = args.data_root or tempfile.mkdtemp(prefix='real-estate-bench-')
+    report = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'results': run(args.scales, data_root, args.reruns, args.keep_cache),
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'wrote {args.output}', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""Synthetic Zillow and rent/crime CSVs with the same schema as the bundled data.
+
+    python -m benchmarks.synthetic --scale 10 --out bench_data/x10
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+# Row counts of the bundled files; the rent/crime file follows the Kaggle export size
+BASE_ROWS = {
+    'home_value': 895,
+    'market_heat': 928,
+    'rentcrime_kaggle': 10_000,
+}
+HOME_VALUE_MONTHS = pd.date_range('2000-01-31', '2024-04-30', freq='ME').strftime('%Y-%m-%d').tolist()
+MARKET_HEAT_MONTHS = pd.date_range('2018-01-31', '2024-04-30', freq='ME').strftime('%Y-%m-%d').tolist()
+STATES = [
+    'AL', 'AK', 'AZ', 'AR', 'CA', 'CO', 'CT', 'DE', 'DC', 'FL', 'GA', 'HI', 'ID', 'IL', 'IN', 'IA', 'KS',
+    'KY', 'LA', 'ME', 'MD', 'MA', 'MI', 'MN', 'MS', 'MO', 'MT', 'NE', 'NV', 'NH', 'NJ', 'NM', 'NY', 'NC',
+    'ND', 'OH', 'OK', 'OR', 'PA', 'RI', 'SC', 'SD', 'TN', 'TX', 'UT', 'VT', 'VA', 'WA', 'WV', 'WI', 'WY',
+]
+RACE_COLUMNS = ['racepctblack', 'racePctWhite', 'racePctAsian', 'racePctHisp']
+CRIME_COLUMNS = [
+    'murdPerPop', 'rapesPerPop', 'robbbPerPop', 'assaultPerPop', 'burglPerPop',
+    'larcPerPop', 'autoTheftPerPop', 'arsonsPerPop', 'ViolentCrimesPerPop', 'nonViolPerPop',
+]
+
+
+def _regions(n, rng):
+    # First row is the national aggregate, like the Zillow exports
+    states = rng.choice(STATES, size=n - 1)
+    return pd.DataFrame({
+        'RegionID': np.arange(102001, 102001 + n),
+        'SizeRank': np.arange(n),
+        'RegionName': ['United States'] + [f'Metro {i}, {state}' for i, state in enumerate(states, start=1)],
+        'RegionType': ['country'] + ['msa'] * (n - 1),
+        'StateName': [''] + states.tolist(),
+    })
+
+
+def home_values(n, rng):
+    regions = _regions(n, rng)
+    base = rng.uniform(60_000, 400_000, size=(n, 1))
+    steps = rng.normal(0.003, 0.01, size=(n, len(HOME_VALUE_MONTHS)))
+    values = base * np.exp(np.cumsum(steps, axis=1))
+    # Smaller metros only enter the index part way through the history
+    starts = rng.integers(0, len(HOME_VALUE_MONTHS) // 3, size=n) * (rng.random(n) < 0.2)
+    values[np.arange(len(HOME_VALUE_MONTHS)) < starts[:, None]] = np.nan
+    return pd.concat([regions, pd.DataFrame(values, columns=HOME_VALUE_MONTHS)], axis=1)
+
+
+def market_heat(n, home_value_regions, rng):
+    # Heat index regions overlap the home value regions, plus some extras
+    shared = home_value_regions.iloc[:min(n, len(home_value_regions))]
+    extra = _regions(n - len(shared) + 1, rng).iloc[1:]
+    extra['RegionID'] += len(home_value_regions) + 1_000_000
+    regions = pd.concat([shared, extra], ignore_index=True)
+    regions['SizeRank'] = np.arange(len(regions))
+
+    level = rng.uniform(30, 80, size=(n, 1))
+    values = np.clip(np.round(level + np.cumsum(rng.normal(0, 2, size=(n, len(MARKET_HEAT_MONTHS))), axis=1)), 0, 150)
+    values[rng.random(values.shape) < 0.02] = np.nan
+    return pd.concat([regions, pd.DataFrame(values, columns=MARKET_HEAT_MONTHS)], axis=1)
+
+
+def rent_crime(n, rng):
+    n_cities = max(len(STATES), n // 20)
+    city_states = rng.choice(STATES, size=n_cities)
+    city_lat = rng.uniform(25, 48, size=n_cities)
+    city_lon = rng.uniform(-124, -67, size=n_cities)
+    city = rng.integers(0, n_cities, size=n)
+
+    df = pd.DataFrame({
+        'id': rng.integers(5_000_000_000, 6_000_000_000, size=n),
+        'title': [f'Apartment {i}' for i in range(n)],
+        'bathrooms': rng.integers(1, 4, size=n),
+        'bedrooms': rng.integers(0, 5, size=n),
+        'price': rng.integers(400, 6_000, size=n),
+        'square_feet': rng.integers(250, 3_000, size=n),
+        'cityname': [f'City {i}' for i in city],
+        'state': city_states[city],
+        'latitude': city_lat[city] + rng.normal(0, 0.05, size=n),
+        'longitude': city_lon[city] + rng.normal(0, 0.05, size=n),
+    })
+    # Socio-economic columns are per city, repeated on every listing
+    race = rng.dirichlet(np.ones(len(RACE_COLUMNS)), size=n_cities) * 100
+    for i, col in enumerate(RACE_COLUMNS):
+        df[col] = race[city, i]
+    for col in CRIME_COLUMNS:
+        df[col] = rng.gamma(2.0, 50.0, size=n_cities)[city]
+    df['population'] = rng.integers(10_000, 3_000_000, size=n_cities)[city]
+    df['medIncome'] = rng.uniform(25_000, 120_000, size=n_cities)[city]
+    return df
+
+
+def generate(out_dir, scale=1, seed=0):
+    """Write home_value.csv, market_heat.csv and rentcrime_kaggle.csv at `scale` x the bundled row counts."""
+    rng = np.random.default_rng(seed)
+    data_dir = os.path.join(out_dir, 'data')
+    os.makedirs(data_dir, exist_ok=True)
+
+    home = home_values(BASE_ROWS['home_value'] * scale, rng)
+    heat = market_heat(BASE_ROWS['market_heat'] * scale, home.iloc[:, :5], rng)
+    rent = rent_crime(BASE_ROWS['rentcrime_kaggle'] * scale, rng)
+
+    home.to_csv(os.path.join(data_dir, 'home_value.csv'), index=False)
+    heat.to_csv(os.path.join(data_dir, 'market_heat.csv'), index=False)
+    rent.to_csv(os.path.join(data_dir, 'rentcrime_kaggle.csv'), index=False)
+    return {'home_value': len(home), 'market_heat': len(heat), 'rentcrime_kaggle': len(rent)}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', type=int, default=1)
+    parser.add_argument('--out', required=True)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    print(generate(args.out, args.scale, args.seed))
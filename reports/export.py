@@ -0,0 +1,206 @@
+"""Headless export of the Home Values, Rent Analysis and Community Analysis reports.
+
+Renders the charts and metrics of every (state, region) pair to PNG, HTML and JSON
+without a Streamlit server, spread over a process pool. Finished regions are marked
+with the version of the sources their page reads, so an interrupted run picks up where
+it stopped and a rerun only redoes the pages whose data changed.
+
+    python -m reports.export --output report_output --workers 8
+"""
+import argparse
+import base64
+import html
+import json
+import math
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+REPORT_PAGES = ['home_values', 'rent_analysis', 'community_analysis']
+FORMATS = ['png', 'html', 'json']
+DONE_MARKER = '.done'
+# Source files each page reads; its markers only go stale when one of these changes
+PAGE_SOURCES = {
+    'home_values': ['home_value', 'market_heat'],
+    'rent_analysis': ['rent_crime'],
+    'community_analysis': ['rent_crime'],
+}
+
+
+def _slug(name):
+    return re.sub(r'[^A-Za-z0-9._-]+', '_', str(name)).strip('_') or '_'
+
+
+def _json_safe(value):
+    # NaN and infinities are not valid JSON
+    if isinstance(value, dict):
+        return {key: _json_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(item) for item in value]
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def _format_value(value):
+    if isinstance(value, dict):
+        return ', '.join(f'{key}: {_format_value(item)}' for key, item in value.items())
+    if isinstance(value, list):
+        return '; '.join(_format_value(item) for item in value)
+    if isinstance(value, float):
+        return f'{value:,.2f}'
+    return str(value)
+
+
+def _write_atomic(path, data):
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _render_html(title, metrics, images, formats):
+    rows = ''.join(
+        f'<tr><th>{html.escape(name)}</th><td>{html.escape(_format_value(value))}</td></tr>'
+        for name, value in metrics.items()
+    )
+    figures = ''.join(
+        f'<img src="{chart}.png" alt="{html.escape(chart)}">' if 'png' in formats
+        else f'<img src="data:image/png;base64,{base64.b64encode(image).decode()}" alt="{html.escape(chart)}">'
+        for chart, image in images.items()
+    )
+    return (
+        f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>{html.escape(title)}</title>'
+        '<style>body{font-family:sans-serif}img{max-width:100%}th{text-align:left;padding-right:1em}</style>'
+        f'</head><body><h1>{html.escape(title)}</h1><table>{rows}</table>{figures}</body></html>'
+    )
+
+
+def region_dir(output, page, state, region):
+    return os.path.join(output, page, _slug(state), _slug(region))
+
+
+def list_regions(page, states=None):
+    """Every (state, region) pair a page can show, in the order its selectboxes list them."""
+    from utils.index import rent_crime_index, zillow_index
+
+    region_index = zillow_index() if page == 'home_values' else rent_crime_index()
+    return [
+        (state, region)
+        for state in region_index.states if not states or state in states
+        for region in region_index.regions(state)
+    ]
+
+
+def export_region(output, page, state, region, formats, version):
+    """Render one region's report; returns its status ('exported' or 'no data')."""
+    from utils.charts import render_figure
+    from utils.data import data_version, pin_version
+    from utils.reports import community_report, home_value_report, rent_report
+
+    pin_version(version)
+    builders = {'home_values': home_value_report, 'rent_analysis': rent_report, 'community_analysis': community_report}
+    report = builders[page](state, region)
+    directory = region_dir(output, page, state, region)
+    os.makedirs(directory, exist_ok=True)
+
+    status = 'no data'
+    if report is not None:
+        status = 'exported'
+        metrics = _json_safe(report.metrics)
+        images = {chart: render_figure(draw(), 'png') for chart, draw in report.charts.items()} if {'png', 'html'} & set(formats) else {}
+        if 'png' in formats:
+            for chart, image in images.items():
+                _write_atomic(os.path.join(directory, f'{chart}.png'), image)
+        if 'json' in formats:
+            payload = {'page': page, 'state': state, 'region': region, 'metrics': metrics, 'charts': list(report.charts)}
+            _write_atomic(os.path.join(directory, 'report.json'), json.dumps(payload, indent=2).encode())
+        if 'html' in formats:
+            title = f'{page.replace("_", " ").title()}: {region}, {state}'
+            _write_atomic(os.path.join(directory, 'report.html'), _render_html(title, metrics, images, formats).encode())
+
+    # Written last, so a region only counts as done once all of its files are in place
+    marker = {'version': data_version(*PAGE_SOURCES[page]), 'formats': sorted(formats), 'status': status}
+    _write_atomic(os.path.join(directory, DONE_MARKER), json.dumps(marker).encode())
+    return status
+
+
+def _is_done(output, page, state, region, formats, page_version):
+    try:
+        with open(os.path.join(region_dir(output, page, state, region), DONE_MARKER)) as f:
+            marker = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return marker.get('version') == page_version and set(formats) <= set(marker.get('formats', []))
+
+
+def _init_worker(version):
+    import matplotlib
+    from streamlit.logger import set_log_level
+    from utils.data import pin_version
+
+    matplotlib.use('Agg')
+    set_log_level('error')
+    pin_version(version)
+
+
+def run(output, pages=REPORT_PAGES, formats=FORMATS, workers=None, states=None, force=False):
+    from utils.data import RENT_CRIME_SOURCE, data_version, scan_version
+    from utils.refresh import warm
+
+    _init_worker(None)
+    version = scan_version()
+    # Build every derived store once up front; workers then only map the cached files
+    print('preparing data stores', file=sys.stderr)
+    warm(version)
+    if not os.path.exists(RENT_CRIME_SOURCE):
+        pages = [page for page in pages if page == 'home_values']
+
+    page_versions = {page: data_version(*PAGE_SOURCES[page]) for page in pages}
+    tasks = [(page, state, region) for page in pages for state, region in list_regions(page, states)]
+    pending = [task for task in tasks if force or not _is_done(output, *task, formats, page_versions[task[0]])]
+    summary = {'regions': len(tasks), 'skipped': len(tasks) - len(pending), 'exported': 0, 'no data': 0, 'failed': []}
+    print(f'{len(pending)} of {len(tasks)} regions to export', file=sys.stderr)
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(version,)) as pool:
+        futures = {pool.submit(export_region, output, *task, formats, version): task for task in pending}
+        for done, future in enumerate(as_completed(futures), 1):
+            page, state, region = futures[future]
+            try:
+                summary[future.result()] += 1
+            except Exception as exc:
+                summary['failed'].append({'page': page, 'state': state, 'region': region, 'error': repr(exc)})
+            elapsed = time.perf_counter() - started
+            rate = done / elapsed if elapsed else 0.0
+            eta = (len(pending) - done) / rate if rate else 0.0
+            print(f'\r[{done}/{len(pending)}] {rate:.1f} regions/s, eta {eta:.0f}s  {page} {state} {region}'[:120].ljust(120),
+                  end='', file=sys.stderr, flush=True)
+    if pending:
+        print(file=sys.stderr)
+    summary['seconds'] = round(time.perf_counter() - started, 2)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output', default='report_output')
+    parser.add_argument('--pages', nargs='+', choices=REPORT_PAGES, default=REPORT_PAGES)
+    parser.add_argument('--formats', nargs='+', choices=FORMATS, default=FORMATS)
+    parser.add_argument('--states', nargs='+', help='Only export regions of these states')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--force', action='store_true', help='Re-export regions that are already done')
+    args = parser.parse_args()
+
+    summary = run(args.output, args.pages, args.formats, args.workers, args.states, args.force)
+    os.makedirs(args.output, exist_ok=True)
+    with open(os.path.join(args.output, 'summary.json'), 'w') as f:
+        json.dump(summary, f, indent=2)
+    print(json.dumps({key: value if key != 'failed' else len(value) for key, value in summary.items()}), file=sys.stderr)
+    sys.exit(1 if summary['failed'] else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.data import CACHE_DIR, current_digest, load_zillow, month_columns, prune_versions, write_atomic
+
+ROLLUP_STATS = ['mean', 'median', 'count', 'sum']
+
+# Grouping column of each rollup level; the national level aggregates every region with a state
+ROLLUP_LEVELS = {
+    'state': 'StateName',
+    'region_type': 'RegionType',
+    'national': None,
+}
+NATIONAL = 'United States'
+
+
+def _regions_digest(df):
+    # Fingerprint of the region rows and their groups; stored months are only reusable if these are unchanged
+    rows = pd.util.hash_pandas_object(df[['RegionID', 'StateName', 'RegionType']].astype(str), index=False)
+    return format(int(rows.sum()) & 0xffffffffffff, 'x')
+
+
+def month_fingerprints(df, months):
+    # Content hash of each month column; Zillow revises past months, so a month is only reused while these match
+    return {
+        month: hashlib.blake2b(np.ascontiguousarray(df[month].to_numpy(np.float64)).tobytes(), digest_size=8).hexdigest()
+        for month in months
+    }
+
+
+def _level_stats(df, months, column):
+    if column is None:
+        values = df.loc[df['StateName'].notna(), months]
+        return {stat: values.agg(stat).to_frame(NATIONAL).T.astype('float64') for stat in ROLLUP_STATS}
+    grouped = df.groupby(column, observed=True)[months]
+    return {stat: grouped.agg(stat).astype('float64') for stat in ROLLUP_STATS}
+
+
+def compute_rollups(df, months):
+    """Rollup x month table of ROLLUP_STATS, indexed by (Level, Statistic, Group)."""
+    tables = {}
+    for level, column in ROLLUP_LEVELS.items():
+        for stat, table in _level_stats(df, months, column).items():
+            table.index = table.index.astype(str)
+            tables[(level, stat)] = table
+    return pd.concat(tables, names=['Level', 'Statistic', 'Group'])
+
+
+def update_rollups(df, previous=None):
+    """Rollups for every month of `df`, reusing the months of `previous` whose values are unchanged.
+
+    New months and months whose fingerprint differs from the one stored with
+    `previous` are aggregated again; the result carries the fingerprints in `attrs`.
+    """
+    months = month_columns(df)
+    fingerprints = month_fingerprints(df, months)
+    stored = previous.attrs.get('fingerprints', {}) if previous is not None else {}
+    reused = [month for month in months if month in stored and stored[month] == fingerprints[month] and month in previous.columns]
+    changed = [month for month in months if month not in reused]
+
+    if not reused:
+        rollups = compute_rollups(df, months)
+    elif not changed:
+        rollups = previous[months]
+    else:
+        rollups = pd.concat([previous[reused], compute_rollups(df, changed)], axis=1)[months]
+    rollups.attrs = {'fingerprints': fingerprints}
+    return rollups
+
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def _load_rollups(name, digest):
+    df = load_zillow(name)
+    stem = os.path.join(CACHE_DIR, f'{name}-rollups-{_regions_digest(df)}')
+
+    previous = pd.read_parquet(f'{stem}.parquet') if os.path.exists(f'{stem}.parquet') else None
+    rollups = update_rollups(df, previous)
+    if previous is None or rollups.attrs['fingerprints'] != previous.attrs.get('fingerprints'):
+        write_atomic(f'{stem}.parquet', rollups.to_parquet)
+        prune_versions(f'{name}-rollups-', stem, ('.parquet',))
+    # Sorted once so every (level, stat) lookup is a slice
+    return rollups.sort_index()
+
+
+def load_rollups(name):
+    return _load_rollups(name, current_digest(name))
+
+
+def rollup_table(name, level='state', stat='mean'):
+    # One row per group of `level` with the requested statistic for every month
+    return load_rollups(name).loc[(level, stat)]
+
+
+def state_table(name, stat='mean'):
+    return rollup_table(name, 'state', stat)
@@ -0,0 +1,91 @@
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+import streamlit as st
+
+from utils.profiling import stage
+
+# Same savefig defaults st.pyplot uses, but never wider than st.image's maximum
+# content width so Streamlit does not resize and re-encode the cached bytes on every rerun
+SAVEFIG_KWARGS = {'bbox_inches': 'tight'}
+MAX_DPI = 200
+MAX_WIDTH_PX = 1460
+
+
+class RenderCache:
+    """Size-bounded LRU cache of rendered chart bytes, shared across sessions."""
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            image = self._entries.get(key)
+            if image is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return image
+
+    def put(self, key, image):
+        with self._lock:
+            if key in self._entries:
+                self.size -= len(self._entries.pop(key))
+            self._entries[key] = image
+            self.size += len(image)
+            # Evict least recently used charts, but always keep the newest one
+            while self.size > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self.size, 'hits': self.hits, 'misses': self.misses}
+
+
+def render_figure(fig, fmt='png'):
+    # Serialize a figure and always release it from the pyplot figure manager
+    import matplotlib.pyplot as plt
+
+    try:
+        buffer = BytesIO()
+        dpi = min(MAX_DPI, MAX_WIDTH_PX / fig.get_figwidth())
+        fig.savefig(buffer, format=fmt, dpi=dpi, **SAVEFIG_KWARGS)
+        return buffer.getvalue()
+    finally:
+        plt.close(fig)
+
+
+@st.cache_resource(show_spinner=False)
+def render_cache():
+    return RenderCache()
+
+
+def cached_chart(page, chart, selection, version, draw, fmt='png'):
+    # `draw` builds and returns a figure; it only runs when the chart is not cached
+    key = (page, chart, selection, version, fmt)
+    cache = render_cache()
+    image = cache.get(key)
+    if image is None:
+        with stage(f'draw:{chart}'):
+            fig = draw()
+        with stage(f'serialize:{chart}'):
+            image = render_figure(fig, fmt)
+        cache.put(key, image)
+    return image
+
+
+def show_chart(page, chart, selection, version, draw, fmt='png'):
+    image = cached_chart(page, chart, selection, version, draw, fmt)
+    with stage(f'send:{chart}'):
+        if fmt == 'svg':
+            st.image(image.decode('utf-8'), width='stretch')
+        else:
+            st.image(image, width='stretch', output_format='PNG')
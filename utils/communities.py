@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.data import current_digest, load_rent_crime
+from utils.rent_stats import rent_stats
+
+RACE_COLUMNS = ['racepctblack', 'racePctWhite', 'racePctAsian', 'racePctHisp']
+CRIME_COLUMNS = [
+    'murdPerPop', 'rapesPerPop', 'robbbPerPop', 'assaultPerPop', 'burglPerPop',
+    'larcPerPop', 'autoTheftPerPop', 'arsonsPerPop', 'ViolentCrimesPerPop', 'nonViolPerPop',
+]
+RACE_LABELS = ['Black', 'White', 'Asian', 'Hispanic']
+CRIME_LABELS = [
+    'Murder', 'Rape', 'Robbery', 'Assault', 'Burglery',
+    'Larceny', 'Auto Theft', 'Arsons', 'Violent Crimes', 'non Violent',
+]
+# City-level values repeated on every listing of the city
+CITY_COLUMNS = ['population', 'medIncome']
+FEATURE_COLUMNS = RACE_COLUMNS + CRIME_COLUMNS + CITY_COLUMNS
+
+
+def city_profiles(df):
+    """One row per (state, cityname): mean race and crime rates plus population and median income."""
+    grouped = df.groupby(['state', 'cityname'], observed=True, sort=False)
+    profiles = pd.concat([
+        grouped[RACE_COLUMNS + CRIME_COLUMNS].mean().astype('float64'),
+        grouped[CITY_COLUMNS].first().astype('float64'),
+    ], axis=1).reset_index()
+    profiles['state'] = profiles['state'].astype(str)
+    profiles['cityname'] = profiles['cityname'].astype(str)
+    return profiles
+
+
+def standardize(profiles):
+    # z-scores per feature; population is log-scaled first and missing values sit at the mean (0)
+    features = profiles[FEATURE_COLUMNS].copy()
+    features['population'] = np.log1p(features['population'])
+    std = features.std().replace(0, 1)
+    return ((features - features.mean()) / std).fillna(0).to_numpy(np.float32)
+
+
+class CommunityIndex:
+    """Standardized per-city feature matrix with a vectorized brute-force k-nearest-neighbour search.
+
+    `profiles` also carries each city's median rent so searches can be restricted to a
+    rent range as well as to a set of states.
+    """
+
+    def __init__(self, profiles):
+        self.profiles = profiles
+        self.features = standardize(profiles)
+        self.sq_norms = (self.features.astype(np.float64) ** 2).sum(axis=1)
+        self.states = profiles['state'].to_numpy()
+        self.rents = profiles['median_rent'].to_numpy()
+        self._rows = {key: row for row, key in enumerate(zip(profiles['state'], profiles['cityname']))}
+
+    def profile(self, state, city):
+        row = self._rows.get((state, city))
+        return None if row is None else self.profiles.iloc[row]
+
+    def similar(self, state, city, k=10, states=None, rent_range=None):
+        """The `k` cities closest to (state, city) in feature space, nearest first."""
+        row = self._rows.get((state, city))
+        if row is None:
+            return self.profiles.iloc[[]].assign(distance=pd.Series(dtype='float64'))
+
+        query = self.features[row].astype(np.float64)
+        distances = self.sq_norms - 2 * (self.features @ query) + self.sq_norms[row]
+
+        mask = np.ones(len(distances), dtype=bool)
+        mask[row] = False
+        if states:
+            mask &= np.isin(self.states, list(states))
+        if rent_range is not None:
+            mask &= (self.rents >= rent_range[0]) & (self.rents <= rent_range[1])
+
+        candidates = np.flatnonzero(mask)
+        k = min(k, len(candidates))
+        if k == 0:
+            return self.profiles.iloc[[]].assign(distance=pd.Series(dtype='float64'))
+        keys = distances[candidates]
+        best = np.argpartition(keys, k - 1)[:k]
+        best = candidates[best[np.argsort(keys[best], kind='stable')]]
+        return self.profiles.iloc[best].assign(distance=np.sqrt(np.maximum(distances[best], 0)))
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _community_index(digest):
+    profiles = city_profiles(load_rent_crime('community'))
+    rents = rent_stats().table[['state', 'cityname', 'median']].rename(columns={'median': 'median_rent'})
+    return CommunityIndex(profiles.merge(rents, on=['state', 'cityname'], how='left'))
+
+
+def community_index():
+    # City profiles and their feature matrix, built once per data version
+    return _community_index(current_digest('rent_crime'))
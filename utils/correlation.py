@@ -0,0 +1,144 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from numpy.lib.stride_tricks import sliding_window_view
+
+from utils.data import ZILLOW_SOURCES, data_version, zillow_metadata
+from utils.timeseries import zillow_series
+
+MAX_LAG = 12
+ROLLING_WINDOW = 12
+MIN_PERIODS = 12
+
+
+def pearson(x, y, min_periods=MIN_PERIODS):
+    """Row-wise Pearson correlation along the last axis, over months where both values exist."""
+    mask = ~(np.isnan(x) | np.isnan(y))
+    n = mask.sum(axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        dx = np.where(mask, x - (np.where(mask, x, 0).sum(axis=-1) / n)[..., None], 0)
+        dy = np.where(mask, y - (np.where(mask, y, 0).sum(axis=-1) / n)[..., None], 0)
+        r = (dx * dy).sum(axis=-1) / np.sqrt((dx * dx).sum(axis=-1) * (dy * dy).sum(axis=-1))
+    return np.where(n >= min_periods, r, np.nan)
+
+
+def spearman(x, y, min_periods=MIN_PERIODS):
+    # Pearson correlation of the row-wise ranks of the months both series cover
+    mask = ~(np.isnan(x) | np.isnan(y))
+    x_ranks = pd.DataFrame(np.where(mask, x, np.nan)).rank(axis=1).to_numpy()
+    y_ranks = pd.DataFrame(np.where(mask, y, np.nan)).rank(axis=1).to_numpy()
+    return pearson(x_ranks, y_ranks, min_periods)
+
+
+def correlate(home_values, heat_index, max_lag=MAX_LAG, window=ROLLING_WINDOW):
+    """Correlation statistics for aligned regions x months home value and heat index matrices.
+
+    Returns per-region Pearson/Spearman correlation of the levels, the rolling-window
+    correlation matrix, and the lag (in months) at which the heat index best leads
+    month-over-month home value growth.
+    """
+    home_values = np.asarray(home_values, dtype=np.float64)
+    heat_index = np.asarray(heat_index, dtype=np.float64)
+    n_months = home_values.shape[1]
+
+    rolling = np.full(home_values.shape, np.nan)
+    if n_months >= window:
+        rolling[:, window - 1:] = pearson(
+            sliding_window_view(home_values, window, axis=1),
+            sliding_window_view(heat_index, window, axis=1),
+            min_periods=window,
+        )
+
+    # Heat index at month t against price growth at month t + lag
+    with np.errstate(divide='ignore', invalid='ignore'):
+        growth = np.full(home_values.shape, np.nan)
+        growth[:, 1:] = home_values[:, 1:] / home_values[:, :-1] - 1
+    lags = range(max(min(max_lag, n_months - MIN_PERIODS), 0) + 1)
+    lag_corr = np.column_stack([pearson(heat_index[:, :n_months - lag], growth[:, lag:]) for lag in lags])
+    has_lag = ~np.isnan(lag_corr).all(axis=1)
+    best_lag = np.full(len(home_values), -1)
+    best_lag[has_lag] = np.nanargmax(lag_corr[has_lag], axis=1)
+
+    return {
+        'months': (~(np.isnan(home_values) | np.isnan(heat_index))).sum(axis=1),
+        'pearson': pearson(home_values, heat_index),
+        'spearman': spearman(home_values, heat_index),
+        'rolling_corr_latest': rolling[:, -1],
+        'lag0_corr': lag_corr[:, 0],
+        'best_lag': best_lag,
+        'best_lag_corr': np.where(has_lag, lag_corr[np.arange(len(lag_corr)), np.maximum(best_lag, 0)], np.nan),
+        'rolling': rolling,
+    }
+
+
+def _correlate_chunks(home_values, heat_index, workers):
+    # Regions are independent, so row chunks can be spread over a process pool
+    chunks = np.array_split(np.arange(len(home_values)), workers)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        parts = list(pool.map(correlate, [home_values[rows] for rows in chunks], [heat_index[rows] for rows in chunks]))
+    return {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+
+
+class CorrelationResult:
+    """Per-region home value vs. heat index correlation table plus rolling correlations."""
+
+    def __init__(self, table, dates, rolling):
+        self.table = table
+        self.dates = dates
+        self.rolling = rolling
+        self._rows = pd.Series(np.arange(len(table)), index=table['RegionID'])
+
+    def region(self, region_id):
+        row = self._rows.get(region_id)
+        return None if row is None else self.table.iloc[row]
+
+    def rolling_correlation(self, region_id):
+        row = self._rows.get(region_id)
+        if row is None:
+            return pd.Series(dtype='float64')
+        return pd.Series(self.rolling[row], index=self.dates).dropna()
+
+    def heat_leads_price(self, n=10, state=None, min_lag=1):
+        # Regions whose heat index leads price growth, strongest lead correlation first
+        table = self.table[(self.table['best_lag'] >= min_lag) & self.table['best_lag_corr'].notna()]
+        if state is not None:
+            table = table[table['StateName'] == state]
+        return table.nlargest(n, 'best_lag_corr')
+
+
+def build_correlations(workers=1):
+    series = zillow_series()
+    home_meta = zillow_metadata('home_value')
+    heat_meta = zillow_metadata('market_heat')
+
+    # Regions present in both datasets, joined on RegionID
+    pairs = home_meta[['RegionID', 'RegionName', 'RegionType', 'StateName']].reset_index(names='home_row').merge(
+        heat_meta[['RegionID']].reset_index(names='heat_row'), on='RegionID'
+    )
+    heat_values = series.values['market_heat'][pairs['heat_row'].to_numpy()]
+    covered = np.flatnonzero(~np.isnan(heat_values).all(axis=0))
+    months = slice(covered[0], covered[-1] + 1) if len(covered) else slice(0, 0)
+
+    home_values = series.values['home_value'][pairs['home_row'].to_numpy(), months]
+    heat_values = heat_values[:, months]
+    if workers > 1 and len(pairs) >= workers:
+        stats = _correlate_chunks(home_values, heat_values, workers)
+    else:
+        stats = correlate(home_values, heat_values)
+
+    rolling = stats.pop('rolling')
+    table = pd.concat([pairs.drop(columns=['home_row', 'heat_row']), pd.DataFrame(stats)], axis=1)
+    return CorrelationResult(table, series.dates[months], rolling)
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _zillow_correlations(version):
+    return build_correlations(workers=int(os.environ.get('REAL_ESTATE_WORKERS', '1')))
+
+
+def zillow_correlations():
+    # Correlation results for every region, computed once per data version
+    return _zillow_correlations(data_version(*ZILLOW_SOURCES))
@@ -0,0 +1,324 @@
+import contextlib
+import hashlib
+import json
+import os
+import threading
+import time
+import tracemalloc
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import streamlit as st
+from pandas.api.types import union_categoricals
+
+from utils.profiling import stage
+
+DATA_DIR = 'data'
+CACHE_DIR = os.path.join(DATA_DIR, '.cache')
+
+# Descriptive columns that precede the monthly value columns in the Zillow exports
+ID_COLUMNS = ['RegionID', 'SizeRank', 'RegionName', 'RegionType', 'StateName']
+ID_DTYPES = {
+    'RegionID': 'int32',
+    'SizeRank': 'int32',
+    'RegionName': 'object',
+    'RegionType': 'category',
+    'StateName': 'category',
+}
+
+ZILLOW_SOURCES = {
+    'home_value': os.path.join(DATA_DIR, 'home_value.csv'),
+    'market_heat': os.path.join(DATA_DIR, 'market_heat.csv'),
+}
+RENT_CRIME_SOURCE = os.path.join(DATA_DIR, 'rentcrime_kaggle.csv')
+SOURCES = {**ZILLOW_SOURCES, 'rent_crime': RENT_CRIME_SOURCE}
+
+# Columns each consumer of the rent/crime dataset reads; nothing else is parsed
+RENT_CRIME_COLUMNS = {
+    'map': ['latitude', 'longitude', 'price'],
+    'rent': ['state', 'cityname', 'price', 'square_feet'],
+    'community': [
+        'state', 'cityname',
+        'racepctblack', 'racePctWhite', 'racePctAsian', 'racePctHisp',
+        'murdPerPop', 'rapesPerPop', 'robbbPerPop', 'assaultPerPop', 'burglPerPop',
+        'larcPerPop', 'autoTheftPerPop', 'arsonsPerPop', 'ViolentCrimesPerPop', 'nonViolPerPop',
+        'population', 'medIncome',
+    ],
+}
+RENT_CRIME_CATEGORICAL = ['state', 'cityname']
+RENT_CRIME_CHUNK_ROWS = 50_000
+
+# Largest integer float32 represents exactly; wider integer columns stay in the metadata frame
+FLOAT32_EXACT_INT = 2 ** 24
+
+
+# Version published by the refresh service; until one runs, every lookup re-checks the files
+_published_version = None
+_pinned = threading.local()
+# Set by trace_parse_memory() in processes where nothing else runs during the parse
+_trace_parse = False
+
+
+@lru_cache(maxsize=32)
+def _hash_file(path, mtime_ns, size):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+def source_hash(path):
+    # Only re-hash the file when its mtime or size changes
+    stat = os.stat(path)
+    return _hash_file(path, stat.st_mtime_ns, stat.st_size)
+
+
+def read_zillow_csv(path):
+    header = pd.read_csv(path, nrows=0).columns
+    dtypes = {col: ID_DTYPES.get(col, np.float32) for col in header}
+    return pd.read_csv(path, dtype=dtypes)
+
+
+def read_rent_crime_csv(path, columns=None, chunksize=RENT_CRIME_CHUNK_ROWS, trace_memory=False):
+    """Stream the rent/crime CSV in chunks, keeping only `columns` with compact dtypes.
+
+    Numeric columns are pinned to float32 and text columns become categoricals that
+    are merged across chunks. Load statistics are recorded in `df.attrs['load_stats']`.
+    With `trace_memory`, `peak_bytes` is the tracemalloc peak of the parse (Python and
+    NumPy allocations, not the C tokenizer's own chunk buffer) above what was allocated
+    before it started. tracemalloc counts every thread and slows them all, so only pass it
+    where the parse runs alone; otherwise, or if another tracer is running, it is None.
+    """
+    if columns is None:
+        columns = sorted({col for cols in RENT_CRIME_COLUMNS.values() for col in cols})
+    dtypes = {col: ('str' if col in RENT_CRIME_CATEGORICAL else np.float32) for col in columns}
+
+    start = time.perf_counter()
+    # Never reset the peak of a tracer someone else started
+    trace_memory = trace_memory and not tracemalloc.is_tracing()
+    if trace_memory:
+        tracemalloc.start()
+        baseline_bytes = tracemalloc.get_traced_memory()[0]
+
+    chunks = []
+    for chunk in pd.read_csv(path, usecols=columns, dtype=dtypes, chunksize=chunksize):
+        for col in RENT_CRIME_CATEGORICAL:
+            if col in chunk:
+                chunk[col] = chunk[col].astype('category')
+        chunks.append(chunk)
+
+    if chunks:
+        df = pd.concat(chunks, ignore_index=True)
+        for col in RENT_CRIME_CATEGORICAL:
+            if col in df:
+                df[col] = union_categoricals([chunk[col] for chunk in chunks])
+    else:
+        df = pd.DataFrame({col: pd.Series(dtype=dtypes[col]) for col in columns})
+    df = df[columns]
+
+    peak_bytes = None
+    if trace_memory:
+        peak_bytes = tracemalloc.get_traced_memory()[1] - baseline_bytes
+        tracemalloc.stop()
+    df.attrs['load_stats'] = {
+        'rows': len(df),
+        'chunks': len(chunks),
+        'columns': len(columns),
+        'load_seconds': round(time.perf_counter() - start, 4),
+        'peak_bytes': peak_bytes,
+        'result_bytes': int(df.memory_usage(deep=True).sum()),
+    }
+    return df
+
+
+def write_atomic(path, write):
+    # `write(tmp_path)` writes the file; readers only ever see it complete
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def prune_versions(prefix, keep_stem, suffixes=('.meta.parquet', '.npy')):
+    # Drop older versions of a derived file: every `{prefix}...{suffix}` entry not belonging to `keep_stem`.
+    # Processes building the same version at once race to remove the same files, so missing ones are skipped
+    keep = os.path.basename(keep_stem)
+    for entry in os.listdir(CACHE_DIR):
+        suffix = next((suffix for suffix in suffixes if entry.endswith(suffix)), None)
+        if entry.startswith(prefix) and suffix and entry[:-len(suffix)] != keep:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(os.path.join(CACHE_DIR, entry))
+
+
+def _value_columns(df):
+    numeric = df.select_dtypes('number')
+    return [
+        col for col in numeric.columns
+        if numeric[col].dtype.kind == 'f' or numeric[col].abs().max() < FLOAT32_EXACT_INT
+    ]
+
+
+def _store_frame(stem, df, value_columns):
+    """Persist `df` as a small metadata Parquet file plus a float32 value matrix.
+
+    The matrix is a plain .npy file so every session and every worker process can
+    memory-map the same pages instead of holding a private copy of the numbers.
+    """
+    meta = df.drop(columns=value_columns)
+    table = pa.Table.from_pandas(meta, preserve_index=False)
+    schema_metadata = dict(table.schema.metadata or {})
+    schema_metadata[b'value_columns'] = json.dumps(value_columns).encode()
+    schema_metadata[b'attrs'] = json.dumps(df.attrs).encode()
+    table = table.replace_schema_metadata(schema_metadata)
+
+    def write_matrix(path):
+        with open(path, 'wb') as f:
+            np.save(f, np.ascontiguousarray(df[value_columns].to_numpy(np.float32)))
+
+    write_atomic(f'{stem}.npy', write_matrix)
+    write_atomic(f'{stem}.meta.parquet', lambda path: pq.write_table(table, path))
+
+
+def _open_frame(stem):
+    # Metadata is read into memory; values stay a read-only mapping of the .npy file
+    table = pq.read_table(f'{stem}.meta.parquet')
+    value_columns = json.loads(table.schema.metadata[b'value_columns'])
+    meta = table.to_pandas()
+    meta.attrs = json.loads(table.schema.metadata.get(b'attrs', b'{}'))
+    matrix = np.load(f'{stem}.npy', mmap_mode='r')
+    values = pd.DataFrame(matrix, columns=value_columns, copy=False)
+    return meta, matrix, pd.concat([meta, values], axis=1)
+
+
+def _ensure_stored(name, digest, read, value_columns=None):
+    """Path stem of the stored parse of source `name` at `digest`, parsing the file if needed.
+
+    Storing a version prunes the older ones. Processes that already mapped an old version
+    keep reading it (removed files stay mapped), but one that is still pinned to it and has
+    not loaded it yet cannot rebuild it: the file on disk no longer has that digest, so this
+    raises RuntimeError and its reruns fail until the refresh service publishes the new version.
+    """
+    stem = os.path.join(CACHE_DIR, f'{name}-{digest}')
+    if not (os.path.exists(f'{stem}.meta.parquet') and os.path.exists(f'{stem}.npy')):
+        with stage(f'parse:{name}'):
+            df = read()
+        # The file may have been replaced since `digest` was pinned; never file its contents under the old hash
+        if source_hash(SOURCES[name]) != digest:
+            raise RuntimeError(f'{SOURCES[name]} changed while version {digest} was being built')
+        _store_frame(stem, df, value_columns(df) if value_columns else _value_columns(df))
+        prune_versions(f'{name}-', stem)
+    return stem
+
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def _load_zillow(name, digest):
+    stem = _ensure_stored(name, digest, lambda: read_zillow_csv(ZILLOW_SOURCES[name]), month_columns)
+    return _open_frame(stem)
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _load_rent_crime(digest):
+    stem = _ensure_stored('rent_crime', digest, lambda: read_rent_crime_csv(RENT_CRIME_SOURCE, trace_memory=_trace_parse))
+    return _open_frame(stem)
+
+
+def zillow_metadata(name):
+    return _load_zillow(name, current_digest(name))[0]
+
+
+def zillow_matrix(name):
+    # Read-only regions x months float32 memory map
+    return _load_zillow(name, current_digest(name))[1]
+
+
+def zillow_months(name):
+    # Month labels of the matrix columns, oldest first
+    return month_columns(load_zillow(name))
+
+
+def load_zillow(name):
+    # Shared by every session and backed by the memory map, so callers must not mutate it in place
+    return _load_zillow(name, current_digest(name))[2]
+
+
+def load_home_values():
+    return load_zillow('home_value')
+
+
+def load_market_heat():
+    return load_zillow('market_heat')
+
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def _rent_crime_view(consumer, digest):
+    return _load_rent_crime(digest)[2][RENT_CRIME_COLUMNS[consumer]]
+
+
+def load_rent_crime(consumer):
+    # Column projection declared in RENT_CRIME_COLUMNS; a view over the shared memory map, so never mutate it
+    return _rent_crime_view(consumer, current_digest('rent_crime'))
+
+
+def trace_parse_memory():
+    # Measure peak_bytes of rent/crime parses in this process; only for processes that parse alone
+    global _trace_parse
+    _trace_parse = True
+
+
+def rent_crime_load_stats():
+    # Row count, chunk count, load time and peak/result bytes of the CSV parse that built this version.
+    # peak_bytes is None unless the parse ran in the refresh worker, the only place it is measured
+    return _load_rent_crime(current_digest('rent_crime'))[0].attrs.get('load_stats', {})
+
+
+def month_columns(df):
+    return [col for col in df.columns if col not in ID_COLUMNS]
+
+
+def latest_month(df):
+    return month_columns(df)[-1]
+
+
+def shift_month(month, years):
+    # Month-end column label `years` before (negative) or after `month`
+    shifted = pd.Timestamp(month) + pd.DateOffset(years=years) + pd.offsets.MonthEnd(0)
+    return shifted.strftime('%Y-%m-%d')
+
+
+def scan_version():
+    # Content hash of every source currently on disk
+    return {name: source_hash(path) for name, path in SOURCES.items() if os.path.exists(path)}
+
+
+def publish_version(version):
+    """Atomically switch the version new reruns read; set once a refresh has built it."""
+    global _published_version
+    _published_version = dict(version)
+
+
+def published_version():
+    return _published_version
+
+
+def pin_version(version=None):
+    # Every lookup in this thread (one Streamlit rerun) sees the same data version
+    _pinned.version = dict(version) if version is not None else (_published_version or scan_version())
+    return _pinned.version
+
+
+def current_version():
+    return getattr(_pinned, 'version', None) or _published_version or scan_version()
+
+
+def current_digest(name):
+    version = current_version()
+    return version[name] if name in version else source_hash(SOURCES[name])
+
+
+def data_version(*names):
+    # Combined content hash of the given sources, used to key derived artifacts
+    return '-'.join(current_digest(name) for name in names)
@@ -0,0 +1,45 @@
+import numpy as np
+
+
+def lttb(x, y, threshold):
+    """Indices of the `threshold` points Largest-Triangle-Three-Buckets keeps from (x, y).
+
+    The first and last points are always kept; every bucket in between contributes the
+    point forming the largest triangle with the previously kept point and the mean of
+    the next bucket, which preserves peaks and troughs that plain striding would drop.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    # Bucket boundaries over the interior points 1 .. n - 2
+    edges = (np.arange(threshold - 1) * (n - 2) / (threshold - 2)).astype(np.intp) + 1
+    edges[-1] = n - 1
+
+    sampled = np.empty(threshold, dtype=np.intp)
+    sampled[0], sampled[-1] = 0, n - 1
+    previous = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        next_x = x[end:next_end].mean()
+        next_y = y[end:next_end].mean()
+        area = np.abs(
+            (x[previous] - next_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (next_y - y[previous])
+        )
+        previous = start + int(np.argmax(area))
+        sampled[i + 1] = previous
+    return sampled
+
+
+def downsample(dates, values, max_points):
+    """At most `max_points` (date, value) pairs of a series, missing months dropped."""
+    dates = np.asarray(dates)
+    values = np.asarray(values, dtype=np.float64)
+    present = ~np.isnan(values)
+    dates, values = dates[present], values[present]
+    keep = lttb(dates.astype('datetime64[ns]').astype(np.int64), values, max_points)
+    return dates[keep], values[keep]
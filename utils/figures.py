@@ -0,0 +1,118 @@
+# Charts shared by the pages and the batch export; each returns a new figure.
+# Plotting backends are imported on first draw, so pages whose charts are all cached never load them
+
+BACKGROUND = '#e4e4e4'
+RACE_COLORS = ['black', '#FFE5B4', '#c9a437', '#a6631d']
+
+
+def _shade(fig, ax):
+    ax.set_facecolor(BACKGROUND)
+    fig.patch.set_facecolor(BACKGROUND)
+
+
+def home_values(dates, values, region):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    fig, ax = plt.subplots(figsize=(7, 5))
+    sns.lineplot(x=dates, y=values, marker='o', ax=ax)
+    ax.set_title(f'Home Values in {region} Over Time', fontsize=16)
+    ax.set_xlabel('Date', fontsize=14)
+    ax.set_ylabel('Home Value', fontsize=14)
+    ax.grid(True)
+    _shade(fig, ax)
+    return fig
+
+
+def price_distribution(values, region):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    fig, ax = plt.subplots(figsize=(7, 5))
+    sns.histplot(values, kde=True, ax=ax, color='skyblue')
+    ax.set_title(f'House Prices Distribution in {region}', fontsize=16)
+    ax.set_xlabel('House Price', fontsize=14)
+    ax.set_ylabel('Frequency', fontsize=14)
+    _shade(fig, ax)
+    return fig
+
+
+def value_heat_correlation(dates, values, heat_values, region):
+    import matplotlib.pyplot as plt
+
+    fig, ax1 = plt.subplots(figsize=(12, 6))
+    ax1.set_title(f"Correlation of Home Values and Market Heat Index in {region}")
+    ax1.set_xlabel('Date')
+    ax1.set_ylabel('Home Values', color='tab:blue')
+    line1, = ax1.plot(dates, values, color='tab:blue', label='Home Values')
+    ax2 = ax1.twinx()
+    ax2.set_ylabel('Market Heat Index', color='tab:red')
+    line2, = ax2.plot(dates, heat_values, color='tab:red', label='Market Heat Index')
+    fig.tight_layout()
+    fig.legend(handles=[line1, line2], loc='upper left')
+    return fig
+
+
+def rent_distribution(stats, region, state):
+    import matplotlib.pyplot as plt
+
+    # Drawn from the precomputed bins; the KDE is scaled to counts as histplot does
+    fig, ax = plt.subplots(figsize=(10, 6))
+    edges = stats['bin_edges']
+    ax.bar(edges[:-1], stats['bin_counts'], width=edges[1:] - edges[:-1], align='edge', color='skyblue', edgecolor='white', alpha=0.75)
+    if len(stats['kde_x']):
+        ax.plot(stats['kde_x'], stats['kde_density'] * stats['count'] * (edges[1] - edges[0]), color='skyblue')
+    ax.set_title(f'Apartment Rent Prices in {region}, {state}', fontsize=16)
+    ax.set_xlabel('Rent Price', fontsize=14)
+    ax.set_ylabel('Frequency', fontsize=14)
+    _shade(fig, ax)
+    return fig
+
+
+def price_vs_sqft(listings, region, state):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    fig, ax = plt.subplots(figsize=(10, 6))
+    sns.scatterplot(x=listings['square_feet'], y=listings['price'], ax=ax, color='blue')
+    ax.set_title(f'Price vs. Square Footage in {region}, {state}', fontsize=16)
+    ax.set_xlabel('Square Feet', fontsize=14)
+    ax.set_ylabel('Rent Price', fontsize=14)
+    _shade(fig, ax)
+    return fig
+
+
+def race_demographics(race_data):
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(5, 3))
+    race_data.plot(kind='pie', ax=ax, colors=RACE_COLORS, startangle=90)
+    ax.set_ylabel('')  # Hide the y-label for a cleaner look
+    _shade(fig, ax)
+    return fig
+
+
+def crime_rates(crime_data, region, state):
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(12, 7))
+    crime_data.sort_values().plot(kind='barh', ax=ax, color='salmon')
+    ax.set_title(f'Average Crime Rates in {region}, {state}', fontsize=16)
+    ax.set_xlabel('Average Incidents per Capita', fontsize=14)
+    ax.set_ylabel('Crime Type', fontsize=14)
+    _shade(fig, ax)
+    return fig
+
+
+def state_heat_index(state_heat):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    fig, ax = plt.subplots(figsize=(14, 8))
+    sns.barplot(x=state_heat.index, y=state_heat.mean(axis=1), ax=ax)
+    ax.set_title("Average Market Heat Index Comparison by State (2018-2024)")
+    ax.set_xlabel("State")
+    ax.set_ylabel("Average Market Heat Index")
+    ax.tick_params(axis='x', rotation=90)
+    return fig
+
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.aggregates import rollup_table
+from utils.data import current_digest, zillow_matrix, zillow_metadata, zillow_months
+
+
+def compute_growth(start_values, end_values, start, end):
+    """Absolute change, percentage change and CAGR (%) between two month columns."""
+    start_values = np.asarray(start_values, dtype=np.float64)
+    end_values = np.asarray(end_values, dtype=np.float64)
+    years = (pd.Timestamp(end) - pd.Timestamp(start)).days / 365.25
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        change = end_values - start_values
+        pct_change = change / start_values * 100
+        cagr = ((end_values / start_values) ** (1 / years) - 1) * 100 if years > 0 else np.full_like(change, np.nan)
+    return {
+        'start_value': start_values,
+        'end_value': end_values,
+        'change': change,
+        'pct_change': pct_change,
+        'cagr': cagr,
+    }
+
+
+@st.cache_resource(max_entries=64, show_spinner=False)
+def _growth_table(name, digest, start, end, level):
+    if level == 'region':
+        # Only the two month columns of the memory-mapped matrix are read
+        meta = zillow_metadata(name)
+        months = zillow_months(name)
+        matrix = zillow_matrix(name)
+        growth = compute_growth(matrix[:, months.index(start)], matrix[:, months.index(end)], start, end)
+        return pd.concat([meta[['RegionID', 'RegionName', 'RegionType', 'StateName']], pd.DataFrame(growth)], axis=1)
+
+    table = rollup_table(name, level, 'mean')
+    return pd.DataFrame(compute_growth(table[start], table[end], start, end), index=table.index)
+
+
+def growth_table(name, start, end, level='region'):
+    """Growth between `start` and `end` for every region, or for every group of a rollup level.
+
+    Results are cached per (data version, window, level), so moving a window slider
+    back and forth only computes each window once.
+    """
+    return _growth_table(name, current_digest(name), start, end, level)
+
+
+def top_n(table, n=10, by='pct_change', largest=True, state=None, region_type=None):
+    """The `n` highest (or lowest) rows by `by`, using a partial sort instead of a full one."""
+    mask = np.ones(len(table), dtype=bool)
+    if state is not None:
+        mask &= (table['StateName'] == state).to_numpy()
+    if region_type is not None:
+        mask &= (table['RegionType'] == region_type).to_numpy()
+
+    candidates = np.flatnonzero(mask & ~np.isnan(table[by].to_numpy()))
+    k = min(n, len(candidates))
+    if k == 0:
+        return table.iloc[[]]
+
+    keys = table[by].to_numpy()[candidates]
+    keys = -keys if largest else keys
+    best = np.argpartition(keys, k - 1)[:k]
+    return table.iloc[candidates[best[np.argsort(keys[best], kind='stable')]]]
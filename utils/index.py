@@ -0,0 +1,59 @@
+import numpy as np
+import streamlit as st
+
+from utils.data import ZILLOW_SOURCES, current_digest, load_rent_crime, load_zillow
+
+EMPTY_ROWS = np.empty(0, dtype=np.intp)
+
+
+class RegionIndex:
+    """Hash index from state to its regions and from (state, region) to row positions.
+
+    `frames` maps a dataset name to a DataFrame; each is grouped once, so building the
+    index is a single pass per dataset and every lookup afterwards is a dict access.
+    `listed` names the dataset whose states and regions are offered for selection
+    (all datasets when None); rows can still be looked up in every dataset.
+    """
+
+    def __init__(self, frames, state_col='StateName', region_col='RegionName', listed=None):
+        self.positions = {
+            name: df.groupby([state_col, region_col], observed=True, sort=False).indices
+            for name, df in frames.items()
+        }
+
+        # States keep their order of first appearance (Zillow files are ordered by SizeRank)
+        regions_by_state = {}
+        for name, positions in self.positions.items():
+            if listed is not None and name != listed:
+                continue
+            for state, region in positions:
+                regions_by_state.setdefault(state, set()).add(region)
+        self.states = list(regions_by_state)
+        self.regions_by_state = {state: sorted(regions) for state, regions in regions_by_state.items()}
+
+    def regions(self, state):
+        return self.regions_by_state.get(state, [])
+
+    def rows(self, name, state, region):
+        return self.positions[name].get((state, region), EMPTY_ROWS)
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _zillow_index(home_value_digest, market_heat_digest):
+    # Regions are listed from the home value data, as the pages always did
+    return RegionIndex({name: load_zillow(name) for name in ZILLOW_SOURCES}, listed='home_value')
+
+
+def zillow_index():
+    # Shared index over the home value and market heat datasets for the current data version
+    return _zillow_index(*(current_digest(name) for name in ZILLOW_SOURCES))
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _rent_crime_index(digest):
+    return RegionIndex({'rent': load_rent_crime('rent')}, state_col='state', region_col='cityname')
+
+
+def rent_crime_index():
+    # Every projection of the rent/crime data shares its row order, so one index serves them all
+    return _rent_crime_index(current_digest('rent_crime'))
@@ -0,0 +1,75 @@
+import pandas as pd
+
+from utils.downsample import downsample
+
+# Points kept per series: about one per pixel of the chart's width in the wide layout
+FULL_WIDTH_PX = 1200
+HALF_WIDTH_PX = 600
+
+# Drag to pan and scroll to zoom along the date axis, in the browser
+ZOOM = {'name': 'zoom', 'select': {'type': 'interval', 'encodings': ['x']}, 'bind': 'scales'}
+
+
+def series_frame(series, max_points):
+    """Long-format frame of `{label: (dates, values)}`, each series downsampled to `max_points`."""
+    frames = []
+    for label, (dates, values) in series.items():
+        dates, values = downsample(dates, values, max_points)
+        frames.append(pd.DataFrame({'date': dates, 'value': values, 'series': label}))
+    if not frames:
+        return pd.DataFrame({'date': pd.Series(dtype='datetime64[ns]'), 'value': pd.Series(dtype='float64'), 'series': pd.Series(dtype='str')})
+    return pd.concat(frames, ignore_index=True)
+
+
+def home_values_chart(dates, values, region, max_points=HALF_WIDTH_PX):
+    data = series_frame({'Home Value': (dates, values)}, max_points)
+    spec = {
+        'title': f'Home Values in {region} Over Time',
+        'mark': {'type': 'line', 'point': True, 'tooltip': True},
+        'encoding': {
+            'x': {'field': 'date', 'type': 'temporal', 'title': 'Date'},
+            'y': {'field': 'value', 'type': 'quantitative', 'title': 'Home Value', 'scale': {'zero': False}},
+        },
+        'params': [ZOOM],
+    }
+    return data, spec
+
+
+def value_heat_chart(dates, values, heat_values, region, max_points=FULL_WIDTH_PX):
+    # Two layers on one date axis, each with its own y scale
+    data = series_frame({'Home Values': (dates, values), 'Market Heat Index': (dates, heat_values)}, max_points)
+
+    def layer(label, color, params=None):
+        return {
+            'transform': [{'filter': {'field': 'series', 'equal': label}}],
+            'mark': {'type': 'line', 'color': color, 'tooltip': True},
+            'encoding': {
+                'x': {'field': 'date', 'type': 'temporal', 'title': 'Date'},
+                'y': {'field': 'value', 'type': 'quantitative', 'title': label, 'scale': {'zero': False}, 'axis': {'titleColor': color}},
+            },
+            **({'params': params} if params else {}),
+        }
+
+    spec = {
+        'title': f'Correlation of Home Values and Market Heat Index in {region}',
+        'layer': [layer('Home Values', '#1f77b4', [ZOOM]), layer('Market Heat Index', '#d62728')],
+        'resolve': {'scale': {'y': 'independent'}},
+    }
+    return data, spec
+
+
+def state_trends_chart(table, states, max_points=FULL_WIDTH_PX, title=None):
+    """Multi-state line chart from a state x month table; every state is downsampled on its own."""
+    dates = pd.to_datetime(table.columns).values
+    data = series_frame({state: (dates, table.loc[state].to_numpy()) for state in states if state in table.index}, max_points)
+    spec = {
+        'title': title,
+        'mark': {'type': 'line', 'tooltip': True},
+        'encoding': {
+            'x': {'field': 'date', 'type': 'temporal', 'title': 'Date'},
+            'y': {'field': 'value', 'type': 'quantitative', 'title': 'Market Heat Index', 'scale': {'zero': False}},
+            'color': {'field': 'series', 'type': 'nominal', 'title': 'State'},
+        },
+        'params': [ZOOM],
+    }
+    return data, spec
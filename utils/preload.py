@@ -0,0 +1,45 @@
+"""Warm the data stores, caches and plotting backends, then serve the app from the same process.
+
+Use it in place of `streamlit run Home.py`; any extra arguments are passed on to it:
+
+    python -m utils.preload --server.port 8501
+
+Everything below is cached per process, so the first session on a fresh worker
+finds the derived stores loaded and the chart libraries imported.
+"""
+import importlib
+import sys
+import time
+
+from utils.data import publish_version, scan_version
+from utils.refresh import warm
+
+APP = 'Home.py'
+BACKENDS = ('matplotlib.pyplot', 'seaborn', 'pydeck')
+
+
+def preload(backends=True):
+    started = time.perf_counter()
+    version = scan_version()
+    warm(version)
+    publish_version(version)
+    if backends:
+        # Imported only to load them; the pages import them again on first draw
+        import matplotlib
+        matplotlib.use('Agg')
+        for module in BACKENDS:
+            importlib.import_module(module)
+    return time.perf_counter() - started
+
+
+def main():
+    from streamlit.web import cli
+
+    seconds = preload()
+    print(f'preloaded data stores in {seconds:.2f}s', file=sys.stderr)
+    sys.argv = ['streamlit', 'run', APP, *sys.argv[1:]]
+    sys.exit(cli.main())
+
+
+if __name__ == '__main__':
+    main()
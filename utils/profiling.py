@@ -0,0 +1,111 @@
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+import streamlit as st
+
+# Per-rerun JSON lines log; set the variable to an empty string to disable it
+TIMINGS_LOG = os.environ.get('REAL_ESTATE_TIMINGS_LOG', os.path.join('logs', 'timings.jsonl'))
+
+# Streamlit runs every session's script in its own thread
+_local = threading.local()
+_log_lock = threading.Lock()
+
+
+class RerunTimings:
+    """Wall time and net allocated memory blocks per stage of one script run."""
+
+    def __init__(self, page):
+        self.page = page
+        self.started = time.perf_counter()
+        self.stages = {}
+        self.stack = []
+
+    def add(self, name, seconds, blocks):
+        total = self.stages.setdefault(name, {'calls': 0, 'seconds': 0.0, 'blocks': 0})
+        total['calls'] += 1
+        total['seconds'] += seconds
+        total['blocks'] += blocks
+
+    def record(self):
+        return {
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'page': self.page,
+            'total_seconds': round(time.perf_counter() - self.started, 6),
+            'stages': {
+                name: {**total, 'seconds': round(total['seconds'], 6)}
+                for name, total in self.stages.items()
+            },
+        }
+
+
+def begin_rerun(page):
+    _local.timings = RerunTimings(page)
+    return _local.timings
+
+
+def current_rerun():
+    return getattr(_local, 'timings', None)
+
+
+@contextmanager
+def stage(name):
+    # Nested stages are recorded as 'outer/inner'; a no-op outside an instrumented rerun
+    timings = current_rerun()
+    if timings is None:
+        yield
+        return
+
+    timings.stack.append(name)
+    full_name = '/'.join(timings.stack)
+    blocks = sys.getallocatedblocks()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(full_name, time.perf_counter() - start, sys.getallocatedblocks() - blocks)
+        timings.stack.pop()
+
+
+def timed(name=None):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name or func.__name__):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _write_log(record):
+    if not TIMINGS_LOG:
+        return
+    line = json.dumps(record) + '\n'
+    with _log_lock:
+        os.makedirs(os.path.dirname(TIMINGS_LOG) or '.', exist_ok=True)
+        with open(TIMINGS_LOG, 'a') as f:
+            f.write(line)
+
+
+def end_rerun():
+    """Log the finished rerun and show the sidebar timing panel when it is switched on."""
+    timings = current_rerun()
+    if timings is None:
+        return
+    _local.timings = None
+
+    record = timings.record()
+    _write_log(record)
+
+    if st.sidebar.checkbox('Show stage timings', key='show_stage_timings'):
+        st.sidebar.caption(f"{record['page']}: {record['total_seconds'] * 1000:.1f} ms")
+        stages = pd.DataFrame.from_dict(record['stages'], orient='index')
+        if not stages.empty:
+            stages['ms'] = (stages.pop('seconds') * 1000).round(2)
+            st.sidebar.dataframe(stages[['ms', 'calls', 'blocks']])
+    return record
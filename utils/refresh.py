@@ -0,0 +1,116 @@
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import streamlit as st
+
+from utils.data import ZILLOW_SOURCES, RENT_CRIME_SOURCE, pin_version, publish_version, published_version, scan_version, trace_parse_memory
+
+POLL_SECONDS = float(os.environ.get('REAL_ESTATE_REFRESH_SECONDS', '5'))
+
+logger = logging.getLogger(__name__)
+
+
+def build_stores(version):
+    """Parse and aggregate everything of `version` that is kept in data/.cache.
+
+    That is the parsed sources, the Zillow rollups, the aligned month matrices and the
+    rent statistics; a process that calls it after another one has only maps and reads them.
+    """
+    from utils.aggregates import load_rollups
+    from utils.data import RENT_CRIME_COLUMNS, load_rent_crime, load_zillow
+    from utils.rent_stats import rent_stats
+    from utils.timeseries import zillow_series
+
+    pin_version(version)
+    for name in ZILLOW_SOURCES:
+        load_zillow(name)
+        load_rollups(name)
+    zillow_series()
+    if os.path.exists(RENT_CRIME_SOURCE):
+        for consumer in RENT_CRIME_COLUMNS:
+            load_rent_crime(consumer)
+        rent_stats()
+
+
+def warm(version):
+    # Every derived store of `version` in this process; the indexes, correlations, map
+    # pyramid and community index live only in memory and are built here each time
+    from utils.communities import community_index
+    from utils.correlation import zillow_correlations
+    from utils.index import rent_crime_index, zillow_index
+    from utils.spatial import map_pyramid
+
+    build_stores(version)
+    zillow_index()
+    zillow_correlations()
+    if os.path.exists(RENT_CRIME_SOURCE):
+        rent_crime_index()
+        map_pyramid()
+        community_index()
+
+
+class RefreshService:
+    """Watches data/ and swaps in a fully built data version when a source changes.
+
+    The on-disk stores are rebuilt in a worker process while reruns keep reading the
+    published version; the new version is only published once it is warm in this process, and
+    reruns already in flight keep the version they pinned when they started.
+    """
+
+    def __init__(self, poll_seconds=POLL_SECONDS):
+        self.poll_seconds = poll_seconds
+        self.refreshes = 0
+        self.last_error = None
+        self._pool = self._new_pool()
+        self._thread = threading.Thread(target=self._watch, name='data-refresh', daemon=True)
+
+    def _new_pool(self):
+        # The worker parses with nothing else running, so it is where parse memory is measured
+        return ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn'), initializer=trace_parse_memory)
+
+    def start(self):
+        publish_version(scan_version())
+        self._thread.start()
+        return self
+
+    def refresh(self, version):
+        try:
+            self._pool.submit(build_stores, version).result()
+        except BrokenProcessPool:
+            # The worker died; later polls get a fresh one
+            self._pool = self._new_pool()
+            raise
+        warm(version)
+        publish_version(version)
+        self.refreshes += 1
+
+    def _watch(self):
+        while True:
+            time.sleep(self.poll_seconds)
+            try:
+                version = scan_version()
+                # Compared with the published version, not this thread's pin, so a
+                # version whose warm-up failed here is retried on the next poll
+                if version != published_version():
+                    logger.info('Data changed, rebuilding version %s', version)
+                    self.refresh(version)
+            except Exception as exc:
+                # Keep serving the last good version and retry on the next poll
+                self.last_error = repr(exc)
+                logger.exception('Data refresh failed')
+
+
+@st.cache_resource(show_spinner=False)
+def refresh_service():
+    return RefreshService().start()
+
+
+def pin_data_version():
+    # Called at the top of every page: starts the watcher once per process and pins this rerun's version
+    refresh_service()
+    return pin_version()
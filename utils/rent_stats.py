@@ -0,0 +1,125 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.data import CACHE_DIR, current_digest, load_rent_crime, prune_versions, write_atomic
+
+HIST_BINS = 30
+KDE_POINTS = 200
+# Listings are pre-binned this finely before the KDE is evaluated, bounding its cost for large cities
+KDE_GRID_BINS = 1024
+QUANTILES = {'q25': 0.25, 'median': 0.5, 'q75': 0.75}
+STAT_COLUMNS = ['count', 'mean', 'min', 'q25', 'median', 'q75', 'max', 'price_per_sqft', 'price_sqft_corr']
+ARRAY_COLUMNS = ['bin_edges', 'bin_counts', 'kde_x', 'kde_density']
+
+
+def kde_density(values, lo, hi):
+    """Gaussian KDE with Scott's bandwidth on KDE_POINTS points spanning [lo, hi].
+
+    Matches the curve seaborn's histplot(kde=True) draws; empty when the bandwidth
+    is undefined (fewer than two listings or a single distinct price).
+    """
+    std = values.std(ddof=1) if len(values) > 1 else 0.0
+    if not std > 0:
+        return np.empty(0), np.empty(0)
+    bandwidth = std * len(values) ** (-1 / 5)
+    weights, edges = np.histogram(values, bins=KDE_GRID_BINS, range=(lo, hi))
+    centers = (edges[:-1] + edges[1:]) / 2
+    x = np.linspace(lo, hi, KDE_POINTS)
+    kernel = np.exp(-0.5 * ((x[:, None] - centers[None, :]) / bandwidth) ** 2)
+    density = kernel @ weights / (len(values) * bandwidth * np.sqrt(2 * np.pi))
+    return x, density
+
+
+def city_rent_stats(price, square_feet):
+    # Summary statistics, histogram and KDE of one city's listings
+    has_price = ~np.isnan(price)
+    prices = np.sort(price[has_price])
+    both = has_price & ~np.isnan(square_feet)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        per_sqft = price[both] / square_feet[both]
+        corr = np.corrcoef(price[both], square_feet[both])[0, 1] if both.sum() > 1 else np.nan
+
+    if len(prices) == 0:
+        return {'count': 0, **{col: np.nan for col in STAT_COLUMNS[1:]}, **{col: np.empty(0) for col in ARRAY_COLUMNS}}
+
+    lo, hi = prices[0], prices[-1]
+    bin_counts, bin_edges = np.histogram(prices, bins=HIST_BINS, range=(lo, hi) if hi > lo else (lo - 0.5, hi + 0.5))
+    kde_x, density = kde_density(prices, lo, hi)
+    return {
+        'count': len(prices),
+        'mean': prices.mean(),
+        'min': lo,
+        **{name: np.quantile(prices, q) for name, q in QUANTILES.items()},
+        'max': hi,
+        'price_per_sqft': per_sqft.mean() if len(per_sqft) else np.nan,
+        'price_sqft_corr': corr,
+        'bin_edges': bin_edges,
+        'bin_counts': bin_counts.astype(np.float64),
+        'kde_x': kde_x,
+        'kde_density': density,
+    }
+
+
+def state_rent_stats(state, cities, price, square_feet):
+    """Per-city rows for one state from a single sort of its listings by city."""
+    order = np.argsort(cities, kind='stable')
+    names, starts = np.unique(cities[order], return_index=True)
+    bounds = np.append(starts, len(order))
+    rows = []
+    for i, city in enumerate(names):
+        rows_of_city = order[bounds[i]:bounds[i + 1]]
+        rows.append({'state': state, 'cityname': city, **city_rent_stats(price[rows_of_city], square_feet[rows_of_city])})
+    return rows
+
+
+def compute_rent_stats(df, workers=1):
+    """One grouped pass over all (state, cityname) groups, spread over a process pool by state."""
+    listings = df.dropna(subset=['state', 'cityname'])
+    tasks = [
+        (
+            str(state),
+            group['cityname'].astype(str).to_numpy(),
+            group['price'].to_numpy(np.float64),
+            group['square_feet'].to_numpy(np.float64),
+        )
+        for state, group in listings.groupby('state', observed=True, sort=False)
+    ]
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(state_rent_stats, *zip(*tasks)))
+    else:
+        parts = [state_rent_stats(*task) for task in tasks]
+    return pd.DataFrame([row for part in parts for row in part], columns=['state', 'cityname', *STAT_COLUMNS, *ARRAY_COLUMNS])
+
+
+class RentStats:
+    """Per-city rent statistics table with histogram and KDE arrays, looked up by (state, cityname)."""
+
+    def __init__(self, table):
+        self.table = table
+        self._rows = {key: row for row, key in enumerate(zip(table['state'], table['cityname']))}
+
+    def city(self, state, city):
+        row = self._rows.get((state, city))
+        return None if row is None else self.table.iloc[row]
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _rent_stats(digest):
+    stem = os.path.join(CACHE_DIR, f'rent_stats-{digest}')
+    if os.path.exists(f'{stem}.parquet'):
+        table = pd.read_parquet(f'{stem}.parquet')
+    else:
+        table = compute_rent_stats(load_rent_crime('rent'), workers=int(os.environ.get('REAL_ESTATE_WORKERS', '1')))
+        write_atomic(f'{stem}.parquet', table.to_parquet)
+        prune_versions('rent_stats-', stem, ('.parquet',))
+    return RentStats(table)
+
+
+def rent_stats():
+    # Statistics for every city, computed once per data version and kept on disk between restarts
+    return _rent_stats(current_digest('rent_crime'))
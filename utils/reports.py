@@ -0,0 +1,133 @@
+from functools import partial
+
+import numpy as np
+
+from utils import figures
+from utils.communities import CRIME_COLUMNS, CRIME_LABELS, RACE_COLUMNS, RACE_LABELS, community_index
+from utils.correlation import zillow_correlations
+from utils.data import load_rent_crime, zillow_metadata
+from utils.index import rent_crime_index, zillow_index
+from utils.rent_stats import rent_stats
+from utils.timeseries import zillow_series
+
+PLOT_START = '2018-01-01'
+SIMILAR_COMMUNITIES = 10
+
+
+class RegionReport:
+    """Metrics and chart drawers of one page for one (state, region).
+
+    `charts` maps a chart name to a zero-argument callable returning a figure, so the
+    pages can pass them to show_chart and the batch export can render them to files.
+    """
+
+    def __init__(self, state, region, metrics, charts, **data):
+        self.state = state
+        self.region = region
+        self.metrics = metrics
+        self.charts = charts
+        self.data = data
+
+
+def home_value_report(state, region, start=PLOT_START, end=None):
+    # Metrics and charts over the months [start, end]; None when the region is missing from either Zillow dataset
+    region_index = zillow_index()
+    home_value_rows = region_index.rows('home_value', state, region)
+    heat_index_rows = region_index.rows('market_heat', state, region)
+    if not (len(home_value_rows) and len(heat_index_rows)):
+        return None
+
+    # Both series share the store's month axis, so one date array serves every chart
+    series_store = zillow_series()
+    dates, home_values = series_store.series('home_value', home_value_rows[0], start, end)
+    _, heat_values = series_store.series('market_heat', heat_index_rows[0], start, end)
+    priced = np.flatnonzero(~np.isnan(home_values))
+    if not len(priced):
+        return None
+
+    # Long windows can start before a region's first month of data
+    latest_price = float(home_values[priced[-1]])
+    earliest_price = float(home_values[priced[0]])
+    metrics = {
+        'average_price': float(np.nanmean(home_values)),
+        'highest_price': float(np.nanmax(home_values)),
+        'lowest_price': float(np.nanmin(home_values)),
+        'latest_price': latest_price,
+        'earliest_price': earliest_price,
+        'price_change': latest_price - earliest_price,
+        'price_change_pct': (latest_price - earliest_price) / earliest_price * 100,
+    }
+
+    region_id = int(zillow_metadata('home_value')['RegionID'].iloc[home_value_rows[0]])
+    correlation = zillow_correlations().region(region_id)
+    if correlation is not None:
+        metrics.update({
+            'pearson': float(correlation['pearson']),
+            'spearman': float(correlation['spearman']),
+            'heat_lead_months': int(correlation['best_lag']),
+            'heat_lead_corr': float(correlation['best_lag_corr']),
+        })
+
+    charts = {
+        'home_values': partial(figures.home_values, dates, home_values, region),
+        'price_distribution': partial(figures.price_distribution, home_values, region),
+        'correlation': partial(figures.value_heat_correlation, dates, home_values, heat_values, region),
+    }
+    return RegionReport(
+        state, region, metrics, charts,
+        region_id=region_id, correlation=correlation, dates=dates, home_values=home_values, heat_values=heat_values,
+    )
+
+
+def rent_report(state, city):
+    stats = rent_stats().city(state, city)
+    if stats is None or stats['count'] == 0:
+        return None
+    listings = load_rent_crime('rent').iloc[rent_crime_index().rows('rent', state, city)]
+
+    metrics = {
+        'listings': int(stats['count']),
+        'average_price': float(stats['mean']),
+        'median_price': float(stats['median']),
+        'highest_price': float(stats['max']),
+        'lowest_price': float(stats['min']),
+        'avg_price_per_sqft': float(stats['price_per_sqft']),
+        'price_sqft_corr': float(stats['price_sqft_corr']),
+    }
+    charts = {
+        'rent_distribution': partial(figures.rent_distribution, stats, city, state),
+        'price_vs_sqft': partial(figures.price_vs_sqft, listings, city, state),
+    }
+    return RegionReport(state, city, metrics, charts, stats=stats, listings=listings)
+
+
+def community_report(state, city):
+    communities = community_index()
+    profile = communities.profile(state, city)
+    if profile is None:
+        return None
+
+    race_data = profile[RACE_COLUMNS].astype('float64')
+    race_data.index = RACE_LABELS
+    crime_data = profile[CRIME_COLUMNS].astype('float64')
+    crime_data.index = CRIME_LABELS
+    similar = communities.similar(state, city, SIMILAR_COMMUNITIES)
+
+    metrics = {
+        'race_pct': race_data.to_dict(),
+        'crime_per_capita': crime_data.to_dict(),
+        'average_crime_rate': float(crime_data.mean()),
+        'highest_crime_type': crime_data.idxmax(),
+        'lowest_crime_type': crime_data.idxmin(),
+        'population': float(profile['population']),
+        'median_income': float(profile['medIncome']),
+        'similar_communities': [
+            {'state': row.state, 'city': row.cityname, 'distance': float(row.distance)}
+            for row in similar.itertuples()
+        ],
+    }
+    charts = {
+        'race_demographics': partial(figures.race_demographics, race_data),
+        'crime_rates': partial(figures.crime_rates, crime_data, city, state),
+    }
+    return RegionReport(state, city, metrics, charts, race_data=race_data, crime_data=crime_data, profile=profile)
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.data import current_digest, load_rent_crime
+
+# Grid cell size in degrees for each map detail level, coarsest first
+MAP_LEVELS = {
+    'Country': 2.0,
+    'Region': 0.5,
+    'Metro': 0.125,
+    'City': 0.03,
+}
+METERS_PER_DEGREE = 111_320
+
+
+def grid_bins(df, cell_size):
+    """Aggregate listings into square lat/long cells of `cell_size` degrees.
+
+    Returns one row per non-empty cell with the listing count, median rent and the
+    mean position of its listings, so the map payload depends on the number of cells
+    rather than the number of listings.
+    """
+    points = df.dropna(subset=['latitude', 'longitude'])
+    cells = pd.DataFrame({
+        'cell_lat': np.floor(points['latitude'].to_numpy() / cell_size).astype(np.int32),
+        'cell_lon': np.floor(points['longitude'].to_numpy() / cell_size).astype(np.int32),
+        'latitude': points['latitude'].to_numpy(np.float64),
+        'longitude': points['longitude'].to_numpy(np.float64),
+        'price': points['price'].to_numpy(np.float64),
+    })
+    bins = cells.groupby(['cell_lat', 'cell_lon'], sort=False).agg(
+        latitude=('latitude', 'mean'),
+        longitude=('longitude', 'mean'),
+        count=('price', 'size'),
+        median_price=('price', 'median'),
+    )
+    return bins.reset_index(drop=True)
+
+
+def build_pyramid(df, levels=MAP_LEVELS):
+    return {level: grid_bins(df, cell_size) for level, cell_size in levels.items()}
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _map_pyramid(digest):
+    return build_pyramid(load_rent_crime('map'))
+
+
+def map_pyramid():
+    # Binned listings for every level of MAP_LEVELS, computed once per data version
+    return _map_pyramid(current_digest('rent_crime'))
+
+
+def cell_radius(level):
+    # Hexagon radius in meters roughly matching the level's grid cell
+    return MAP_LEVELS[level] * METERS_PER_DEGREE / 2
@@ -0,0 +1,68 @@
+import os
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.data import CACHE_DIR, ZILLOW_SOURCES, current_digest, load_zillow, month_columns, prune_versions, write_atomic, zillow_matrix
+
+
+def _aligned_matrix(name, version, matrix, positions, n_months):
+    # Datasets that only cover part of the shared axis get a NaN-padded memory-mapped copy
+    stem = os.path.join(CACHE_DIR, f'aligned-{name}-{version}')
+    if not os.path.exists(f'{stem}.npy'):
+        aligned = np.full((matrix.shape[0], n_months), np.nan, dtype=np.float32)
+        aligned[:, positions] = matrix
+
+        def write(path):
+            with open(path, 'wb') as f:
+                np.save(f, aligned)
+
+        write_atomic(f'{stem}.npy', write)
+        prune_versions(f'aligned-{name}-', stem, ('.npy',))
+    return np.load(f'{stem}.npy', mmap_mode='r')
+
+
+class TimeSeriesStore:
+    """Regions x months float32 matrices for every Zillow dataset on one shared month axis.
+
+    Matrix rows follow the row order of the source frames, so positions from
+    `RegionIndex.rows` address them directly. Months a dataset does not cover are NaN.
+    All matrices are read-only memory maps shared with every other session and process.
+    """
+
+    def __init__(self, months_by_name, matrices, version):
+        months = sorted(set().union(*months_by_name.values()))
+        self.months = months
+        self.dates = pd.to_datetime(months).values
+
+        self.values = {}
+        for name, matrix in matrices.items():
+            if months_by_name[name] == months:
+                self.values[name] = matrix
+            else:
+                self.values[name] = _aligned_matrix(name, version, matrix, np.searchsorted(months, months_by_name[name]), len(months))
+
+    def window(self, start=None, end=None):
+        # Slice of the month axis covering [start, end]
+        lo = 0 if start is None else np.searchsorted(self.dates, np.datetime64(start), side='left')
+        hi = len(self.dates) if end is None else np.searchsorted(self.dates, np.datetime64(end), side='right')
+        return slice(lo, hi)
+
+    def series(self, name, row, start=None, end=None):
+        # Dates and a zero-copy view of one region's values
+        window = self.window(start, end)
+        return self.dates[window], self.values[name][row, window]
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _zillow_series(home_value_digest, market_heat_digest):
+    return TimeSeriesStore(
+        {name: month_columns(load_zillow(name)) for name in ZILLOW_SOURCES},
+        {name: zillow_matrix(name) for name in ZILLOW_SOURCES},
+        f'{home_value_digest}-{market_heat_digest}',
+    )
+
+
+def zillow_series():
+    return _zillow_series(*(current_digest(name) for name in ZILLOW_SOURCES))